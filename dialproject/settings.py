@@ -49,6 +49,9 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+
+    # local: batched business page view counters
+    'main.middleware.TrackingMiddleware',
 ]
 ROOT_URLCONF = 'dialproject.urls'
 
@@ -57,13 +60,20 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [ BASE_DIR / 'main' / 'templates' ],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # Compiled templates are kept for the worker's lifetime
+            # (APP_DIRS is replaced by the app_directories loader below)
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
         },
     },
 ]
@@ -113,3 +123,10 @@ LOGIN_REDIRECT_URL = '/'
 LOGOUT_REDIRECT_URL = '/'
 LOGIN_URL = '/login/'
 
+# View / click tracking: seconds between flushes and max buffered rows per worker
+TRACKING_FLUSH_INTERVAL = 30
+TRACKING_MAX_PENDING = 1000
+
+# Run main.warmup when a WSGI worker boots (dialproject/wsgi.py)
+WARMUP_ON_BOOT = True
+
@@ -41,17 +41,29 @@ urlpatterns = [
     # BUSINESS PAGE (Dial style)
     # ====================================================
     path('b/<slug:slug>/', views.business_page, name='business_page'),
+    path('track/<int:listing_id>/<slug:event>/', views.track_event, name='track_event'),
 
     # ====================================================
     # CATEGORY LISTINGS
     # ====================================================
     path('category/<slug:slug>/', views.category_listings, name='category_listings'),
 
+    # ====================================================
+    # CITY PAGES
+    # ====================================================
+    path('city/<slug:slug>/', views.city_listings, name='city_listings'),
+    path('city/<slug:slug>/<slug:category_slug>/', views.city_category_listings, name='city_category_listings'),
+
     # ====================================================
     # CUSTOM UPLOADED TEMPLATE (Dial style)
     # ====================================================
     path('t/<slug:template_slug>/', views.category_template_page, name='category_template'),
 
+    # ====================================================
+    # PARTNER CHANGE FEED
+    # ====================================================
+    path('api/changes/', views.change_feed, name='change_feed'),
+
     # ====================================================
     # PUBLIC ADD LISTING
     # ====================================================
@@ -14,3 +14,12 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dialproject.settings')
 
 application = get_wsgi_application()
+
+# Compile templates, build the URL resolver and prime hot views before the
+# worker takes traffic (profile with: python manage.py startup_profile)
+from django.conf import settings  # noqa: E402
+
+if settings.WARMUP_ON_BOOT:
+    from main.warmup import warm_up
+
+    warm_up()
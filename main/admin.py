@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Listing, Category, ContactMessage
+from .models import Listing, Category, ContactMessage, ListingDailyStats, State, City, CityAlias, RelatedListing, ChangeLogEntry
 
 @admin.register(Listing)
 class ListingAdmin(admin.ModelAdmin):
@@ -12,6 +12,40 @@ class CategoryAdmin(admin.ModelAdmin):
     list_display = ('id','name','slug','icon')
     prepopulated_fields = {'slug': ('name',)}
 
+@admin.register(State)
+class StateAdmin(admin.ModelAdmin):
+    list_display = ('id','name','slug')
+    prepopulated_fields = {'slug': ('name',)}
+
+@admin.register(City)
+class CityAdmin(admin.ModelAdmin):
+    list_display = ('id','name','state','slug','listing_count')
+    list_filter = ('state',)
+    search_fields = ('name',)
+    readonly_fields = ('listing_count',)
+
+@admin.register(CityAlias)
+class CityAliasAdmin(admin.ModelAdmin):
+    list_display = ('alias','state_key','city')
+    search_fields = ('alias','city__name')
+    raw_id_fields = ('city',)
+
+@admin.register(ListingDailyStats)
+class ListingDailyStatsAdmin(admin.ModelAdmin):
+    list_display = ('listing','day','views','call_clicks','whatsapp_clicks','website_clicks')
+    list_filter = ('day',)
+    raw_id_fields = ('listing',)
+
+@admin.register(RelatedListing)
+class RelatedListingAdmin(admin.ModelAdmin):
+    list_display = ('listing','rank','related','score')
+    raw_id_fields = ('listing','related')
+
+@admin.register(ChangeLogEntry)
+class ChangeLogEntryAdmin(admin.ModelAdmin):
+    list_display = ('id','model','object_id','action','changed_at')
+    list_filter = ('model','action')
+
 @admin.register(ContactMessage)
 class ContactMessageAdmin(admin.ModelAdmin):
     list_display = ('name','email','phone','created')
@@ -0,0 +1,146 @@
+from django.db import connection, transaction
+from django.db.models import Max
+
+from .models import Category, ChangeLogEntry, Listing
+
+
+# ==========================================================
+# CHANGE FEED
+# Partners poll ?since=<cursor> and receive only what changed.
+# Payloads are read live at fetch time, so several updates to one
+# object inside a page collapse into its latest state.
+# Entries come from main.signals; code that writes a payload field
+# without save() (QuerySet.update, bulk_update) must call record_many.
+# ==========================================================
+MAX_PAGE_SIZE = 1000
+
+# The cursor is the entry id, so ids must become visible in id order: a
+# poller that has seen id 11 must never later find a committed id 10.
+# SQLite has a single writer, so that holds there. On PostgreSQL sequence
+# values are handed out at INSERT but become visible at COMMIT, so writers
+# take this transaction-level advisory lock first; the next entry can only
+# be inserted once the previous writer has committed or rolled back.
+# The cost is that listing/category writes are serialized from their first
+# log entry to commit, which is fine at this table's write rate.
+LOCK_KEY = 0x6368_6C6F  # "chlo"
+
+
+def _lock():
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", [LOCK_KEY])
+
+
+def record(instance, action):
+    with transaction.atomic():
+        _lock()
+        ChangeLogEntry.objects.create(
+            model=instance._meta.model_name,
+            object_id=instance.pk,
+            action=action,
+        )
+
+
+def is_tracked(model):
+    return model._meta.model_name in SOURCES
+
+
+def record_many(model, object_ids, action):
+    with transaction.atomic():
+        _lock()
+        ChangeLogEntry.objects.bulk_create([
+            ChangeLogEntry(model=model._meta.model_name, object_id=pk, action=action)
+            for pk in object_ids
+        ])
+
+
+def serialize_listing(listing):
+    return {
+        "id": listing.pk,
+        "slug": listing.slug,
+        "title": listing.title,
+        "description": listing.description,
+        "image": listing.image.url if listing.image else None,
+        "phone": listing.phone,
+        "email": listing.email,
+        "website": listing.website,
+        "category": listing.category.slug if listing.category else None,
+        "featured": listing.featured,
+        "address": listing.address,
+        "city": listing.city,
+        "state": listing.state,
+        "created_at": listing.created_at.isoformat(),
+    }
+
+
+def serialize_category(category):
+    return {
+        "id": category.pk,
+        "slug": category.slug,
+        "name": category.name,
+        "icon": category.icon.url if category.icon else None,
+    }
+
+
+SOURCES = {
+    "listing": (Listing.objects.select_related("category"), serialize_listing),
+    "category": (Category.objects.all(), serialize_category),
+}
+
+
+def read_changes(since=0, limit=MAX_PAGE_SIZE):
+    """
+    Return (changes, next_cursor, has_more) for entries after ``since``.
+
+    Each change is {"seq", "model", "id", "action", "data"}; ``data`` is
+    None for tombstones (and for objects deleted later in the feed).
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    entries = list(
+        ChangeLogEntry.objects
+        .filter(id__gt=since)
+        .order_by("id")[:limit + 1]
+    )
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    if not entries:
+        return [], since, False
+
+    # Keep only the newest entry per object within the page
+    latest = {}
+    for entry in entries:
+        latest[(entry.model, entry.object_id)] = entry
+
+    live = {}
+    for model, (queryset, serialize) in SOURCES.items():
+        ids = [pk for (m, pk), e in latest.items() if m == model and e.action != "delete"]
+        if ids:
+            live[model] = {obj.pk: serialize(obj) for obj in queryset.filter(pk__in=ids)}
+
+    changes = [
+        {
+            "seq": entry.id,
+            "model": entry.model,
+            "id": entry.object_id,
+            "action": entry.action,
+            "data": (
+                None if entry.action == "delete"
+                else live.get(entry.model, {}).get(entry.object_id)
+            ),
+        }
+        for entry in sorted(latest.values(), key=lambda e: e.id)
+    ]
+    return changes, entries[-1].id, has_more
+
+
+def compact():
+    """Delete entries superseded by a newer one for the same object."""
+    newest = (
+        ChangeLogEntry.objects
+        .values("model", "object_id")
+        .annotate(newest=Max("id"))
+        .values_list("newest", flat=True)
+    )
+    deleted, _ = ChangeLogEntry.objects.exclude(id__in=newest).delete()
+    return deleted
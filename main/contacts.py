@@ -0,0 +1,38 @@
+import re
+from urllib.parse import urlsplit
+
+
+# ==========================================================
+# CONTACT KEYS
+# Normalized phone / email / website stored on Listing.*_key for
+# exact-match duplicate lookups (see main.dedupe).
+# ==========================================================
+def normalize_phone(phone):
+    """'+91 98470-12345', '098470 12345' -> '9847012345'."""
+    digits = re.sub(r"\D", "", phone or "")
+    # Last 10 digits: drops +91 / 0 trunk prefixes on Indian numbers
+    return digits[-10:] if len(digits) >= 10 else digits
+
+
+def normalize_email(email):
+    return (email or "").strip().lower()
+
+
+def normalize_website(url):
+    """'HTTPS://www.Example.com/' -> 'example.com'."""
+    url = (url or "").strip().lower()
+    if not url:
+        return ""
+    if "://" not in url:
+        url = "http://" + url
+    parts = urlsplit(url)
+    host = parts.netloc.removeprefix("www.")
+    return (host + parts.path).rstrip("/")
+
+
+def contact_keys(phone, email, website):
+    return {
+        "phone_key": normalize_phone(phone),
+        "email_key": normalize_email(email),
+        "website_key": normalize_website(website),
+    }
@@ -0,0 +1,252 @@
+import hashlib
+import re
+from collections import defaultdict
+from functools import lru_cache
+
+from .contacts import contact_keys
+
+
+# ==========================================================
+# NEAR-DUPLICATE LISTINGS
+# Contact details are normalized into exact-match keys (main.contacts,
+# kept numpy-free because models.py imports it); title +
+# address get a MinHash signature whose LSH band hashes are stored
+# in ListingLSHBucket, so a duplicate check is one indexed lookup
+# plus a Jaccard check on a handful of candidates.
+# ==========================================================
+NUM_PERM = 64
+BANDS = 16                      # 16 bands x 4 rows: candidate odds ~64% at J=0.5, ~99% at J=0.7
+ROWS_PER_BAND = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+
+TEXT_THRESHOLD = 0.7            # duplicate on title + address alone
+CONTACT_TEXT_THRESHOLD = 0.4    # duplicate when a phone/email/website also matches
+MAX_CANDIDATES = 50             # Jaccard-checked per lookup, most likely first
+
+_PRIME = (1 << 31) - 1
+
+
+@lru_cache(maxsize=None)
+def _numpy():
+    """numpy and the permutations, on first use: web workers boot without numpy."""
+    import numpy as np
+
+    rng = np.random.RandomState(20240521)  # fixed: stored buckets must stay valid
+    perm_a = rng.randint(1, _PRIME, size=NUM_PERM, dtype=np.uint64)
+    perm_b = rng.randint(0, _PRIME, size=NUM_PERM, dtype=np.uint64)
+    return np, perm_a, perm_b
+
+
+# ----------------------------------------------------------
+# MinHash / LSH
+# ----------------------------------------------------------
+def shingles(title, address=""):
+    text = " ".join(re.findall(r"[a-z0-9]+", f"{title} {address}".lower()))
+    if len(text) <= SHINGLE_SIZE:
+        return {text} if text else set()
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _hash32(value):
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=4).digest(), "little")
+
+
+def minhash(shingle_set):
+    if not shingle_set:
+        return None
+    np, perm_a, perm_b = _numpy()
+    hashes = np.fromiter((_hash32(s) for s in shingle_set), dtype=np.uint64)
+    return ((perm_a[:, None] * hashes[None, :] + perm_b[:, None]) % _PRIME).min(axis=1)
+
+
+def band_buckets(signature):
+    """One signed 64-bit bucket id per band (band number is mixed in)."""
+    if signature is None:
+        return []
+    buckets = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(
+            band.to_bytes(2, "little") + rows.astype("<u4").tobytes(), digest_size=8
+        ).digest()
+        buckets.append(int.from_bytes(digest, "little", signed=True))
+    return buckets
+
+
+def buckets_for(title, address=""):
+    return band_buckets(minhash(shingles(title, address)))
+
+
+def is_duplicate(similarity, shares_contact):
+    if shares_contact:
+        return similarity >= CONTACT_TEXT_THRESHOLD
+    return similarity >= TEXT_THRESHOLD
+
+
+# ----------------------------------------------------------
+# Database lookups
+# ----------------------------------------------------------
+def index_listing(listing):
+    """Replace the stored LSH buckets for one saved listing."""
+    from .models import ListingLSHBucket
+
+    ListingLSHBucket.objects.filter(listing=listing).delete()
+    ListingLSHBucket.objects.bulk_create([
+        ListingLSHBucket(listing=listing, bucket=bucket)
+        for bucket in set(buckets_for(listing.title, listing.address))
+    ])
+
+
+def reindex_all(listing_model, bucket_model):
+    """
+    Recompute contact keys and LSH buckets for every listing. Takes the
+    model classes so migrations can pass their historical ones.
+    Returns the number of listings.
+    """
+    rows = listing_model.objects.order_by("pk").values_list(
+        "pk", "title", "address", "phone", "email", "website"
+    )
+
+    bucket_model.objects.all().delete()
+    listings, buckets = [], []
+    for pk, title, address, phone, email, website in rows.iterator():
+        listings.append(listing_model(pk=pk, **contact_keys(phone, email, website)))
+        buckets.extend(
+            bucket_model(listing_id=pk, bucket=bucket)
+            for bucket in set(buckets_for(title, address))
+        )
+
+    listing_model.objects.bulk_update(
+        listings, ["phone_key", "email_key", "website_key"], batch_size=500
+    )
+    bucket_model.objects.bulk_create(buckets, batch_size=1000)
+    return len(listings)
+
+
+def find_similar(title, address="", phone="", email="", website="", exclude_pk=None):
+    """
+    Return [(listing, similarity, shares_contact)] for stored listings that
+    look like the same business, most similar first.
+    """
+    from django.db.models import Case, Count, Q, Value, When
+
+    from .models import Listing
+
+    keys = {k: v for k, v in contact_keys(phone, email, website).items() if v}
+    buckets = buckets_for(title, address)
+
+    match = Q(lsh_buckets__bucket__in=buckets) if buckets else Q(pk__in=[])
+    for field, value in keys.items():
+        match |= Q(**{field: value})
+
+    # Most likely duplicates first, so the cap below drops the weakest:
+    # shared contact keys, then shared LSH bands
+    shared_contacts = sum(
+        (Case(When(Q(**{f: v}), then=1), default=0) for f, v in keys.items()),
+        Value(0),
+    )
+    candidates = (
+        Listing.objects
+        .filter(match)
+        .annotate(
+            shared_contacts=shared_contacts,
+            shared_buckets=Count(
+                "lsh_buckets", filter=Q(lsh_buckets__bucket__in=buckets), distinct=True
+            ),
+        )
+        .order_by("-shared_contacts", "-shared_buckets", "-pk")
+    )
+    if exclude_pk is not None:
+        candidates = candidates.exclude(pk=exclude_pk)
+
+    own = shingles(title, address)
+    found = []
+    for listing in candidates[:MAX_CANDIDATES]:
+        similarity = jaccard(own, shingles(listing.title, listing.address))
+        shares_contact = any(getattr(listing, f) == v for f, v in keys.items())
+        if is_duplicate(similarity, shares_contact):
+            found.append((listing, similarity, shares_contact))
+
+    found.sort(key=lambda item: -item[1])
+    return found
+
+
+# ----------------------------------------------------------
+# Whole-table clustering (sub-quadratic: LSH buckets + union-find)
+# ----------------------------------------------------------
+class LSHIndex:
+    """In-memory LSH over (id, title, address, contact keys) records."""
+
+    def __init__(self, max_bucket_size=200):
+        self.max_bucket_size = max_bucket_size
+        self.buckets = defaultdict(list)
+        self.contacts = defaultdict(list)
+        self.shingles = {}
+        self.keys = {}
+
+    def add(self, record_id, title, address="", phone="", email="", website=""):
+        self.shingles[record_id] = shingles(title, address)
+        self.keys[record_id] = contact_keys(phone, email, website)
+        for bucket in set(band_buckets(minhash(self.shingles[record_id]))):
+            self.buckets[bucket].append(record_id)
+        for field, value in self.keys[record_id].items():
+            if value:
+                self.contacts[(field, value)].append(record_id)
+
+    def query(self, title, address="", phone="", email="", website=""):
+        """Ids of indexed records that are duplicates of the given data."""
+        own = shingles(title, address)
+        keys = {(f, v) for f, v in contact_keys(phone, email, website).items() if v}
+
+        candidates = set()
+        for bucket in set(band_buckets(minhash(own))):
+            candidates.update(self.buckets.get(bucket, ()))
+        for key in keys:
+            candidates.update(self.contacts.get(key, ()))
+
+        return [
+            rid for rid in candidates
+            if is_duplicate(
+                jaccard(own, self.shingles[rid]),
+                any(self.keys[rid].get(f) == v for f, v in keys),
+            )
+        ]
+
+    def candidate_pairs(self):
+        pairs = set()
+        for group in list(self.buckets.values()) + list(self.contacts.values()):
+            if len(group) < 2 or len(group) > self.max_bucket_size:
+                continue
+            for i, a in enumerate(group):
+                for b in group[i + 1:]:
+                    pairs.add((a, b) if a < b else (b, a))
+        return pairs
+
+    def clusters(self):
+        """Groups (lists of ids, size >= 2) of mutually linked duplicates."""
+        parent = {}
+
+        def find(x):
+            parent.setdefault(x, x)
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        for a, b in self.candidate_pairs():
+            shares_contact = any(
+                v and self.keys[b].get(f) == v for f, v in self.keys[a].items()
+            )
+            if is_duplicate(jaccard(self.shingles[a], self.shingles[b]), shares_contact):
+                parent[find(a)] = find(b)
+
+        groups = defaultdict(list)
+        for x in parent:
+            groups[find(x)].append(x)
+        return [sorted(g) for g in groups.values() if len(g) > 1]
@@ -1,4 +1,7 @@
 from django import forms
+from django.utils.html import format_html_join
+
+from .dedupe import find_similar
 from .models import Listing, ContactMessage, Category
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
@@ -15,6 +18,38 @@ class ListingForm(forms.ModelForm):
             'category', 'address', 'city', 'state', 'featured'
         ]
 
+    # Shown only after a likely duplicate was found
+    allow_duplicate = forms.BooleanField(
+        required=False,
+        label='This is a different business — save anyway',
+        widget=forms.HiddenInput()
+    )
+
+    def clean(self):
+        cleaned = super().clean()
+        if self.errors or cleaned.get('allow_duplicate'):
+            return cleaned
+
+        matches = find_similar(
+            cleaned.get('title', ''),
+            cleaned.get('address', ''),
+            phone=cleaned.get('phone', ''),
+            email=cleaned.get('email', ''),
+            website=cleaned.get('website', ''),
+            exclude_pk=self.instance.pk,
+        )
+        if matches:
+            self.fields['allow_duplicate'].widget = forms.CheckboxInput()
+            raise forms.ValidationError(format_html_join(
+                '', '{}<a href="{}">{}</a>',
+                [
+                    ('This looks like an existing listing: ' if i == 0 else ', ',
+                     listing.get_absolute_url(), listing.title)
+                    for i, (listing, _, _) in enumerate(matches[:3])
+                ],
+            ))
+        return cleaned
+
 
 # -------------------------
 # CONTACT FORM
@@ -0,0 +1,93 @@
+import csv
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from main.models import (
+    City, CityAlias, CityCategoryCount, Listing, count_city_categories, location_key,
+)
+
+
+DEFAULT_ALIASES = Path(__file__).resolve().parents[2] / "data" / "city_aliases.csv"
+
+
+class Command(BaseCommand):
+    help = (
+        "Link every Listing to a normalized City (through the alias table) "
+        "and rebuild the per-city listing counts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--aliases",
+            default=str(DEFAULT_ALIASES),
+            help="CSV of alias,city,state rows to load first "
+                 "(default: main/data/city_aliases.csv).",
+        )
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        loaded = self.load_aliases(options["aliases"])
+
+        # One resolve + one UPDATE per distinct spelling, not per row
+        pairs = (
+            Listing.objects
+            .order_by()
+            .values_list("city", "state")
+            .distinct()
+        )
+        linked = 0
+        for city_text, state_text in pairs:
+            city = City.objects.resolve(city_text, state_text)
+            linked += Listing.objects.filter(
+                city=city_text, state=state_text
+            ).update(location=city)
+
+        # Cities created for a spelling that is now an alias of another city
+        City.objects.filter(aliases__isnull=True, listings__isnull=True).delete()
+
+        counted = self.recount()
+        pairs = count_city_categories(Listing, CityCategoryCount)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Loaded {loaded} aliases, linked {linked} listings, "
+            f"recounted {counted} cities and {pairs} city categories."
+        ))
+
+    def load_aliases(self, path):
+        path = Path(path)
+        if not path.exists():
+            self.stderr.write(f"No alias file at {path}; skipping.")
+            return 0
+
+        loaded = 0
+        with path.open(newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                alias = location_key(row["alias"])
+                if not alias:
+                    continue
+
+                # The canonical name resolves (and is created) like any other spelling
+                city = City.objects.resolve(row["city"], row.get("state", ""))
+                CityAlias.objects.update_or_create(
+                    alias=alias,
+                    state_key=city.state.slug if city.state else "",
+                    defaults={"city": city},
+                )
+                loaded += 1
+        return loaded
+
+    @staticmethod
+    def recount():
+        counts = (
+            Listing.objects
+            .filter(location=OuterRef("pk"))
+            .order_by()
+            .values("location")
+            .annotate(n=Count("pk"))
+            .values("n")
+        )
+        return City.objects.update(listing_count=Coalesce(Subquery(counts), 0))
@@ -0,0 +1,54 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from main import changefeed
+
+
+class Command(BaseCommand):
+    help = (
+        "Print Listing/Category changes after a cursor as JSON lines "
+        "(same data as /api/changes/), or compact the change log."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--since",
+            type=int,
+            default=0,
+            help="Cursor returned by the previous run (0 = from the start).",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=None,
+            help="Stop after this many changes (default: everything).",
+        )
+        parser.add_argument(
+            "--compact",
+            action="store_true",
+            help="Delete log entries superseded by a newer one for the same object.",
+        )
+
+    def handle(self, *args, **options):
+        if options["compact"]:
+            deleted = changefeed.compact()
+            self.stdout.write(self.style.SUCCESS(f"Removed {deleted} superseded entries."))
+            return
+
+        cursor = options["since"]
+        remaining = options["limit"]
+        written = 0
+
+        while remaining is None or remaining > 0:
+            page_size = changefeed.MAX_PAGE_SIZE if remaining is None else remaining
+            changes, cursor, has_more = changefeed.read_changes(cursor, page_size)
+            for change in changes:
+                self.stdout.write(json.dumps(change))
+            written += len(changes)
+            if remaining is not None:
+                remaining -= len(changes)
+            if not has_more:
+                break
+
+        self.stderr.write(f"{written} changes; next cursor: {cursor}")
@@ -0,0 +1,115 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from main.models import Category, City, Listing, RelatedListing
+
+
+# Hot queries issued by main.views, with placeholder parameters.
+# EXPLAIN only needs the shape of the query, not matching rows.
+# The third item, if set, is the index the plan must use; on SQLite a
+# single-column FK index also returns rows in id order, so a dropped
+# composite index would not show up as a scan or a sort.
+HOT_QUERIES = [
+    ("home: featured listings",
+     lambda: Listing.objects.featured()[:6], "listing_featured_id_idx"),
+    ("business_page: listing by slug",
+     lambda: Listing.objects.filter(slug="x"), None),
+    ("business_page: similar businesses",
+     lambda: RelatedListing.objects.filter(listing=0).select_related("related").order_by("rank"),
+     None),
+    ("category_listings: category by slug",
+     lambda: Category.objects.filter(slug="x"), None),
+    ("category_listings: listings in category",
+     lambda: Listing.objects.in_category(0), "listing_category_id_idx"),
+    ("search: city + state",
+     lambda: Listing.objects.in_location(city="x", state="y"), None),
+    ("search: city",
+     lambda: Listing.objects.in_location(city="x"), None),
+    ("search: state",
+     lambda: Listing.objects.in_location(state="y"), None),
+    ("city_listings: city by slug",
+     lambda: City.objects.filter(slug="x"), None),
+    ("city_listings: listings in city",
+     lambda: Listing.objects.in_city(0), "listing_location_id_idx"),
+    ("city_category_listings: listings in city + category",
+     lambda: Listing.objects.in_city(0, 0), "listing_location_cat_id_idx"),
+]
+
+# A plain table scan (index scans print "USING [COVERING] INDEX ...")
+SQLITE_FULL_SCAN_RE = re.compile(r"\bSCAN (?:TABLE )?(\w+)(?!.*\bUSING\b)")
+POSTGRES_FULL_SCAN_RE = re.compile(r"\bSeq Scan on (\w+)")
+
+# An explicit sort step: the ORDER BY is not served by the index, which is
+# what the composite (filter, -id) indexes exist to prevent
+SQLITE_SORT_RE = re.compile(r"\bUSE TEMP B-TREE FOR (?:RIGHT PART OF )?ORDER BY\b")
+POSTGRES_SORT_RE = re.compile(r"^\s*(?:->\s*)?(?:Incremental )?Sort\b", re.MULTILINE)
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN each hot view query on the current database and fail if "
+        "any of them falls back to a full table scan, sorts rows that an "
+        "index should return in ORDER BY order, or stops using its index."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verbose-plans",
+            action="store_true",
+            help="Print the full plan for every query, not just failures.",
+        )
+
+    def handle(self, *args, **options):
+        vendor = connection.vendor
+        if vendor == "sqlite":
+            full_scan_re, sort_re = SQLITE_FULL_SCAN_RE, SQLITE_SORT_RE
+        elif vendor == "postgresql":
+            full_scan_re, sort_re = POSTGRES_FULL_SCAN_RE, POSTGRES_SORT_RE
+        else:
+            raise CommandError(f"Query plan checks are not supported on {vendor}.")
+
+        failures = []
+        for name, build, index in HOT_QUERIES:
+            queryset = build()
+            plan = self.explain(queryset)
+
+            problems = [f"full scan of {t}" for t in full_scan_re.findall(plan)]
+            if queryset.query.order_by and sort_re.search(plan):
+                problems.append("sort not served by an index")
+            if index and index not in plan:
+                problems.append(f"{index} not used")
+
+            if problems:
+                failures.append(name)
+                self.stdout.write(self.style.ERROR(
+                    f"FAIL       {name} ({'; '.join(problems)})"
+                ))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"ok         {name}"))
+
+            if problems or options["verbose_plans"]:
+                self.stdout.write(self.indent(plan))
+
+        if failures:
+            raise CommandError(
+                f"{len(failures)} hot quer{'y' if len(failures) == 1 else 'ies'} "
+                f"degraded (full scan, unindexed sort or missing index)."
+            )
+
+    def explain(self, queryset):
+        if connection.vendor != "postgresql":
+            return queryset.explain()
+
+        # Small tables make Postgres prefer seq scans and sorts even when an
+        # index exists; disabling them shows whether an index *can* be used.
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+                cursor.execute("SET LOCAL enable_sort = off")
+            return queryset.explain()
+
+    @staticmethod
+    def indent(plan):
+        return "\n".join(f"    {line}" for line in plan.splitlines())
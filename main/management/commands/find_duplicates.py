@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from main.dedupe import LSHIndex, reindex_all
+from main.models import Listing, ListingLSHBucket
+
+
+class Command(BaseCommand):
+    help = (
+        "Find clusters of near-duplicate listings across the whole table "
+        "using MinHash LSH (no all-pairs comparison)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reindex",
+            action="store_true",
+            help="Rebuild contact keys and stored LSH buckets for every listing first.",
+        )
+        parser.add_argument(
+            "--max-bucket-size",
+            type=int,
+            default=200,
+            help="Ignore LSH/contact buckets larger than this (boilerplate titles, shared numbers).",
+        )
+
+    def handle(self, *args, **options):
+        if options["reindex"]:
+            self.reindex()
+
+        rows = Listing.objects.order_by("pk").values_list(
+            "pk", "title", "address", "phone", "email", "website"
+        )
+
+        index = LSHIndex(max_bucket_size=options["max_bucket_size"])
+        for pk, title, address, phone, email, website in rows.iterator():
+            index.add(pk, title, address, phone, email, website)
+
+        clusters = index.clusters()
+        titles = dict(
+            Listing.objects
+            .filter(pk__in={pk for cluster in clusters for pk in cluster})
+            .values_list("pk", "title")
+        )
+
+        for cluster in sorted(clusters, key=len, reverse=True):
+            self.stdout.write(", ".join(f"#{pk} {titles[pk]}" for pk in cluster))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(clusters)} duplicate clusters covering "
+            f"{sum(len(c) for c in clusters)} listings."
+        ))
+
+    @transaction.atomic
+    def reindex(self):
+        count = reindex_all(Listing, ListingLSHBucket)
+        self.stdout.write(f"Reindexed {count} listings.")
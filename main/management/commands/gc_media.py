@@ -0,0 +1,92 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from main.storage import content_addressed_fields, is_blob_name
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete content-addressed media blobs that no database row "
+        "references any more (and, with --legacy, unreferenced pre-CAS files)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace-hours",
+            type=float,
+            default=24,
+            help="Keep unreferenced blobs younger than this (in-flight uploads).",
+        )
+        parser.add_argument(
+            "--legacy",
+            action="store_true",
+            help="Also remove unreferenced non-blob files directly in each "
+                 "upload_to directory (uploads from before migrate_media_to_cas).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would be deleted without deleting anything.",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options["grace_hours"])
+        dry_run = options["dry_run"]
+
+        # Reference count per (storage, blob name) across every CAS field
+        refcounts = Counter()
+        roots = {}
+        for model, field in content_addressed_fields():
+            names = (
+                model._default_manager
+                .filter(**{f"{field.name}__gt": ""})
+                .values_list(field.name, flat=True)
+            )
+            for name in names.iterator():
+                refcounts[(id(field.storage), name)] += 1
+
+            upload_dir = str(field.upload_to).rstrip("/")
+            roots[(id(field.storage), upload_dir)] = field.storage
+
+        scanned = deleted = freed = 0
+        for (storage_id, upload_dir), storage in roots.items():
+            for name in self.candidates(storage, upload_dir, options["legacy"]):
+                scanned += 1
+                if refcounts[(storage_id, name)]:
+                    continue
+                if storage.get_modified_time(name) > cutoff:
+                    continue
+
+                size = storage.size(name)
+                if not dry_run:
+                    storage.delete(name)
+                deleted += 1
+                freed += size
+                self.stdout.write(f"{'Would delete' if dry_run else 'Deleted'} {name}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Scanned {scanned} files, "
+            f"{'would remove' if dry_run else 'removed'} {deleted} "
+            f"({freed / 1024:.1f} KiB)."
+        ))
+
+    @staticmethod
+    def candidates(storage, upload_dir, legacy):
+        """Blob names under upload_dir, plus top-level legacy files if asked."""
+        if not storage.exists(upload_dir):
+            return
+        shards, files = storage.listdir(upload_dir)
+        for shard in shards:
+            _, blobs = storage.listdir(f"{upload_dir}/{shard}")
+            for filename in blobs:
+                name = f"{upload_dir}/{shard}/{filename}"
+                if is_blob_name(name):
+                    yield name
+        if legacy:
+            for filename in files:
+                # Skip dotfiles (.DS_Store, .gitkeep); they are not uploads
+                if not filename.startswith("."):
+                    yield f"{upload_dir}/{filename}"
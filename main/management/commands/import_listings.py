@@ -0,0 +1,141 @@
+import csv
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, transaction
+from django.db.models import Q
+
+from main.dedupe import LSHIndex, find_similar
+from main.models import Category, Listing
+
+
+FIELDS = [
+    "title", "description", "phone", "email", "website",
+    "address", "city", "state",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Import listings from a CSV (columns: title, description, phone, "
+        "email, website, category, address, city, state), skipping or "
+        "merging rows that duplicate an existing listing or an earlier row. "
+        "Invalid rows are reported per line; the file imports as one transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("csv_path")
+        parser.add_argument(
+            "--on-duplicate",
+            choices=["skip", "merge", "create"],
+            default="skip",
+            help="skip: drop the row (default); merge: fill blank fields of the "
+                 "existing listing; create: import anyway and report it.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would happen without writing anything.",
+        )
+
+    def handle(self, csv_path, *args, **options):
+        mode = options["on_duplicate"]
+        dry_run = options["dry_run"]
+        categories = {}
+        batch = LSHIndex()
+        targets = {}  # line -> listing the row was created as, merged into or skipped for
+        stats = {"created": 0, "merged": 0, "skipped": 0, "flagged": 0, "invalid": 0}
+
+        try:
+            f = open(csv_path, newline="", encoding="utf-8")
+        except OSError as e:
+            raise CommandError(e)
+
+        with f, transaction.atomic():
+            for line, row in enumerate(csv.DictReader(f), start=2):
+                data = {field: (row.get(field) or "").strip() for field in FIELDS}
+                listing = Listing(category=self.category(row.get("category"), categories), **data)
+
+                # Before the duplicate checks: an invalid row must not become
+                # the "earlier row" a later one merges into
+                errors = self.validation_errors(listing)
+                if errors:
+                    stats["invalid"] += 1
+                    self.stderr.write(f"line {line}: invalid ({errors}), skipped")
+                    continue
+
+                match_args = (data["title"], data["address"])
+                match_kwargs = {k: data[k] for k in ("phone", "email", "website")}
+
+                # An earlier row in this file, else the table
+                earlier = batch.query(*match_args, **match_kwargs)
+                batch.add(line, *match_args, **match_kwargs)
+                if earlier:
+                    first = min(earlier)
+                    existing, label = targets[first], f"line {first}"
+                else:
+                    matches = find_similar(*match_args, **match_kwargs)
+                    existing = matches[0][0] if matches else None
+                    label = f"#{existing.pk} {existing.title}" if existing else ""
+
+                if existing and mode == "skip":
+                    targets[line] = existing
+                    stats["skipped"] += 1
+                    self.stdout.write(f"line {line}: duplicate of {label}, skipped")
+                    continue
+
+                if existing and mode == "merge":
+                    changed = [f for f in FIELDS if data[f] and not getattr(existing, f)]
+                    for field in changed:
+                        setattr(existing, field, data[field])
+                    if changed and not dry_run:
+                        self.save(existing, line)
+                    targets[line] = existing
+                    stats["merged"] += 1
+                    self.stdout.write(
+                        f"line {line}: merged into {label} ({', '.join(changed) or 'nothing new'})"
+                    )
+                    continue
+
+                if existing:
+                    stats["flagged"] += 1
+                    self.stdout.write(f"line {line}: possible duplicate of {label}, imported")
+
+                if not dry_run:
+                    self.save(listing, line)
+                targets[line] = listing
+                stats["created"] += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            ", ".join(f"{n} {label}" for label, n in stats.items())
+            + (" (dry run)" if dry_run else "")
+        ))
+
+    @staticmethod
+    def validation_errors(listing):
+        try:
+            listing.full_clean(exclude=["slug"])  # generated on save
+        except ValidationError as e:
+            return "; ".join(
+                f"{field}: {' '.join(messages)}" for field, messages in e.message_dict.items()
+            )
+        return ""
+
+    @staticmethod
+    def save(listing, line):
+        try:
+            listing.save()
+        except DatabaseError as e:
+            # Raised out of the atomic block, so nothing from the file is kept
+            raise CommandError(f"line {line}: {e}; nothing was imported")
+
+    @staticmethod
+    def category(value, cache):
+        value = (value or "").strip()
+        if not value:
+            return None
+        if value not in cache:
+            cache[value] = Category.objects.filter(
+                Q(slug=value) | Q(name__iexact=value)
+            ).first()
+        return cache[value]
@@ -0,0 +1,108 @@
+import json
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# Boots the project the way a WSGI worker does, in a fresh interpreter so
+# nothing is already imported. Phase timings are printed as JSON on stdout;
+# -X importtime writes per-module import times to stderr.
+BOOT_SCRIPT = """
+import json, os, time
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", {settings_module!r})
+
+phases = {{}}
+t = time.perf_counter()
+import django
+phases["import django"] = time.perf_counter() - t
+
+t = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+phases["django.setup + WSGI handler"] = time.perf_counter() - t
+
+if {warmup!r}:
+    from main.warmup import warm_up
+    for step, seconds in warm_up().items():
+        phases["warm-up: " + step] = seconds
+
+print(json.dumps(phases))
+"""
+
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+class Command(BaseCommand):
+    help = "Report worker boot time, broken down by phase and by imported module."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--top",
+            type=int,
+            default=20,
+            help="Number of slowest modules/packages to list.",
+        )
+        parser.add_argument(
+            "--no-warmup",
+            action="store_true",
+            help="Profile boot without running main.warmup.",
+        )
+
+    def handle(self, *args, **options):
+        script = BOOT_SCRIPT.format(
+            settings_module=settings.SETTINGS_MODULE,
+            warmup=not options["no_warmup"],
+        )
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", script],
+            capture_output=True,
+            text=True,
+            cwd=settings.BASE_DIR,
+        )
+        if proc.returncode != 0:
+            raise CommandError(
+                f"Boot failed with exit code {proc.returncode}:\n{proc.stderr[-2000:]}"
+            )
+
+        phases = json.loads(proc.stdout.strip().splitlines()[-1])
+        modules, packages = self.parse_importtime(proc.stderr)
+        top = options["top"]
+
+        self.stdout.write(self.style.MIGRATE_HEADING("Boot phases"))
+        for phase, seconds in phases.items():
+            self.stdout.write(f"  {seconds * 1000:9.1f} ms  {phase}")
+        self.stdout.write(f"  {sum(phases.values()) * 1000:9.1f} ms  total")
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            "Import time by top-level package (self time)"
+        ))
+        for package, us in sorted(packages.items(), key=lambda kv: -kv[1])[:top]:
+            self.stdout.write(f"  {us / 1000:9.1f} ms  {package}")
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            "Slowest modules (cumulative time)"
+        ))
+        for module, (self_us, cumulative_us) in sorted(
+            modules.items(), key=lambda kv: -kv[1][1]
+        )[:top]:
+            self.stdout.write(
+                f"  {cumulative_us / 1000:9.1f} ms  {module}"
+                f"  (self {self_us / 1000:.1f} ms)"
+            )
+
+    @staticmethod
+    def parse_importtime(output):
+        modules = {}
+        packages = defaultdict(int)
+        for line in output.splitlines():
+            match = IMPORTTIME_RE.match(line)
+            if not match:
+                continue
+            self_us, cumulative_us, _, module = match.groups()
+            modules[module] = (int(self_us), int(cumulative_us))
+            packages[module.split(".")[0]] += int(self_us)
+        return modules, packages
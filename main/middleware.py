@@ -0,0 +1,21 @@
+from . import tracking
+
+
+# ==========================================================
+# TRACKING MIDDLEWARE
+# Counts business page views (views set request.tracked_listing_id)
+# in memory; main.tracking's background thread writes them out.
+# ==========================================================
+class TrackingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        tracking.start_flusher()
+        response = self.get_response(request)
+
+        listing_id = getattr(request, "tracked_listing_id", None)
+        if listing_id is not None and response.status_code == 200:
+            tracking.record(listing_id, "view")
+
+        return response
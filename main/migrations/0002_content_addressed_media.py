@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-19 15:57
+
+import main.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='category',
+            name='icon',
+            field=models.ImageField(blank=True, null=True, storage=main.storage.ContentAddressedStorage(), upload_to='category_icons/'),
+        ),
+        migrations.AlterField(
+            model_name='categorytemplate',
+            name='html_file',
+            field=models.FileField(storage=main.storage.ContentAddressedStorage(), upload_to='category_templates/'),
+        ),
+        migrations.AlterField(
+            model_name='listing',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=main.storage.ContentAddressedStorage(), upload_to='listings/'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.8 on 2026-10-19 15:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0002_content_addressed_media'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ListingDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('call_clicks', models.PositiveIntegerField(default=0)),
+                ('whatsapp_clicks', models.PositiveIntegerField(default=0)),
+                ('website_clicks', models.PositiveIntegerField(default=0)),
+                ('listing', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='main.listing')),
+            ],
+            options={
+                'verbose_name_plural': 'Listing daily stats',
+                'constraints': [models.UniqueConstraint(fields=('listing', 'day'), name='unique_listing_day_stats')],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:01
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0003_listing_daily_stats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(condition=models.Q(('featured', True)), fields=['-id'], name='listing_featured_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(fields=['category', '-id'], name='listing_category_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(django.db.models.functions.text.Lower('city'), django.db.models.functions.text.Lower('state'), name='listing_city_state_ci_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(django.db.models.functions.text.Lower('state'), name='listing_state_ci_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0005_locations'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='listing',
+            name='related_stale',
+            field=models.BooleanField(default=True, editable=False),
+        ),
+        migrations.CreateModel(
+            name='RelatedListing',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('listing', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_listings', to='main.listing')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='main.listing')),
+            ],
+            options={
+                'ordering': ['listing', 'rank'],
+                'constraints': [models.UniqueConstraint(fields=('listing', 'rank'), name='unique_related_listing_rank')],
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:05
+
+from django.db import migrations, models
+
+
+def seed_existing_rows(apps, schema_editor):
+    # Rows that predate the log start the feed as "create" entries
+    ChangeLogEntry = apps.get_model("main", "ChangeLogEntry")
+    for model_name in ("category", "listing"):
+        model = apps.get_model("main", model_name)
+        ChangeLogEntry.objects.bulk_create(
+            [
+                ChangeLogEntry(model=model_name, object_id=pk, action="create")
+                for pk in model.objects.order_by("pk").values_list("pk", flat=True)
+            ],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0006_related_listings'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLogEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(choices=[('listing', 'Listing'), ('category', 'Category')], max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('action', models.CharField(choices=[('create', 'Create'), ('update', 'Update'), ('delete', 'Delete')], max_length=10)),
+                ('changed_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Change log',
+                'indexes': [models.Index(fields=['model', 'object_id', '-id'], name='changelog_object_idx')],
+            },
+        ),
+        migrations.RunPython(seed_existing_rows, migrations.RunPython.noop),
+    ]
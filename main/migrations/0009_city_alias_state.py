@@ -0,0 +1,44 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:15
+
+from django.db import migrations, models
+
+
+def fill_state_keys(apps, schema_editor):
+    # Existing aliases were created with their city's state
+    CityAlias = apps.get_model("main", "CityAlias")
+    for alias in CityAlias.objects.select_related("city__state").exclude(city__state=None):
+        alias.state_key = alias.city.state.slug
+        alias.save(update_fields=["state_key"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0008_listing_duplicate_detection'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='listing',
+            name='listing_city_state_ci_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='listing',
+            name='listing_state_ci_idx',
+        ),
+        migrations.AddField(
+            model_name='cityalias',
+            name='state_key',
+            field=models.CharField(blank=True, max_length=120),
+        ),
+        migrations.AlterField(
+            model_name='cityalias',
+            name='alias',
+            field=models.CharField(max_length=120),
+        ),
+        migrations.RunPython(fill_state_keys, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='cityalias',
+            constraint=models.UniqueConstraint(fields=('alias', 'state_key'), name='cityalias_alias_state_uniq'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+from django.db import migrations
+
+
+def backfill(apps, schema_editor):
+    # Listings saved before 0008 have no contact keys or LSH buckets, so
+    # find_similar would never see them
+    from main.dedupe import reindex_all
+
+    reindex_all(apps.get_model("main", "Listing"), apps.get_model("main", "ListingLSHBucket"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0009_city_alias_state'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-19 16:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def seed_counts(apps, schema_editor):
+    from main.models import count_city_categories
+
+    count_city_categories(
+        apps.get_model("main", "Listing"), apps.get_model("main", "CityCategoryCount")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0010_backfill_duplicate_detection'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CityCategoryCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('listing_count', models.PositiveIntegerField(default=0)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='city_counts', to='main.category')),
+                ('city', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='category_counts', to='main.city')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('city', 'category'), name='citycategory_uniq')],
+            },
+        ),
+        migrations.RunPython(seed_counts, migrations.RunPython.noop),
+    ]
@@ -2,6 +2,9 @@ from django.db import models
 from django.urls import reverse
 from django.utils.text import slugify
 
+from .contacts import contact_keys
+from .storage import content_addressed_storage
+
 
 # ==========================================================
 # CATEGORY TEMPLATE (Admin uploads an HTML template file)
@@ -11,7 +14,10 @@ class CategoryTemplate(models.Model):
     slug = models.SlugField(unique=True, blank=True)
 
     # Admin uploads the HTML file (just like DialAddress)
-    html_file = models.FileField(upload_to="category_templates/")
+    html_file = models.FileField(
+        upload_to="category_templates/",
+        storage=content_addressed_storage,
+    )
 
     def save(self, *args, **kwargs):
         # Auto-generate slug from name if empty
@@ -33,7 +39,12 @@ class CategoryTemplate(models.Model):
 class Category(models.Model):
     name = models.CharField(max_length=200)
     slug = models.SlugField(unique=True, blank=True)
-    icon = models.ImageField(upload_to='category_icons/', blank=True, null=True)
+    icon = models.ImageField(
+        upload_to='category_icons/',
+        storage=content_addressed_storage,
+        blank=True,
+        null=True,
+    )
 
     # Assign a custom template to this category
     template = models.ForeignKey(
@@ -60,6 +71,198 @@ class Category(models.Model):
         return reverse("category_listings", args=[self.slug])
 
 
+# ==========================================================
+# LOCATIONS (State -> City)
+# Listing.city / Listing.state stay free text for the form; each
+# listing is also linked to a normalized City via CityAlias.
+# ==========================================================
+def location_key(text):
+    """Normalize free-text place names: 'kozhikode ' -> 'kozhikode'."""
+    return " ".join(slugify(text or "").split("-"))
+
+
+class State(models.Model):
+    name = models.CharField(max_length=120)
+    slug = models.SlugField(unique=True, blank=True)
+
+    def save(self, *args, **kwargs):
+        if not self.slug:
+            self.slug = slugify(self.name)
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return self.name
+
+
+class CityManager(models.Manager):
+    def resolve(self, city_text, state_text=""):
+        """
+        Map free-text city/state to a City, creating the State, City and
+        alias on first sight. Returns None for a blank city.
+        """
+        key = location_key(city_text)
+        if not key:
+            return None
+        state_key = slugify(location_key(state_text))
+
+        aliases = CityAlias.objects.select_related("city").filter(alias=key)
+        alias = aliases.filter(state_key=state_key).first()
+        if alias:
+            return alias.city
+
+        if not state_key:
+            # No state given: reuse the city only if the spelling is unambiguous
+            matches = list(aliases[:2])
+            if len(matches) == 1:
+                return matches[0].city
+
+        state = None
+        if state_key:
+            state, _ = State.objects.get_or_create(
+                slug=state_key,
+                defaults={"name": location_key(state_text).title()},
+            )
+
+        city = self.create(name=key.title(), state=state)
+        alias, created = CityAlias.objects.get_or_create(
+            alias=key, state_key=state_key, defaults={"city": city}
+        )
+        if not created:
+            # Another request resolved the same spelling first; use its city
+            city.delete()
+        return alias.city
+
+
+class City(models.Model):
+    name = models.CharField(max_length=120)
+    slug = models.SlugField(unique=True, blank=True)
+    state = models.ForeignKey(
+        State,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="cities"
+    )
+
+    # Maintained by main.signals; rebuilt by `manage.py backfill_locations`
+    listing_count = models.PositiveIntegerField(default=0)
+
+    objects = CityManager()
+
+    class Meta:
+        verbose_name_plural = "Cities"
+
+    def save(self, *args, **kwargs):
+        # Auto slug; same city name in two states gets the state appended
+        if not self.slug:
+            base = slugify(self.name)
+            slug_temp = base
+            if self.state and City.objects.filter(slug=slug_temp).exists():
+                slug_temp = f"{base}-{self.state.slug}"
+            counter = 1
+            while City.objects.filter(slug=slug_temp).exists():
+                slug_temp = f"{base}-{counter}"
+                counter += 1
+            self.slug = slug_temp
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.name}, {self.state}" if self.state else self.name
+
+    def get_absolute_url(self):
+        return reverse("city_listings", args=[self.slug])
+
+
+class CityAlias(models.Model):
+    # location_key() of a spelling seen in the wild, e.g. "calicut"
+    alias = models.CharField(max_length=120)
+    # State.slug the spelling was seen with ("" if none): the same city
+    # name in two states is two aliases
+    state_key = models.CharField(max_length=120, blank=True)
+    city = models.ForeignKey(City, on_delete=models.CASCADE, related_name="aliases")
+
+    class Meta:
+        verbose_name_plural = "City aliases"
+        constraints = [
+            models.UniqueConstraint(fields=["alias", "state_key"], name="cityalias_alias_state_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.alias} -> {self.city.name}"
+
+
+class CityCategoryCount(models.Model):
+    """Listings per (city, category), for the category chips on city pages."""
+
+    # Maintained by main.signals; rebuilt by `manage.py backfill_locations`
+    city = models.ForeignKey(City, on_delete=models.CASCADE, related_name="category_counts")
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name="city_counts")
+    listing_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["city", "category"], name="citycategory_uniq"),
+        ]
+
+
+def count_city_categories(listing_model, count_model):
+    """
+    Rebuild count_model (CityCategoryCount) from listing_model (Listing).
+    Takes the model classes so migrations can pass their historical ones.
+    """
+    rows = (
+        listing_model.objects
+        .filter(location__isnull=False, category__isnull=False)
+        .order_by()
+        .values_list("location", "category")
+        .annotate(n=models.Count("pk"))
+    )
+    count_model.objects.all().delete()
+    count_model.objects.bulk_create(
+        [
+            count_model(city_id=city_id, category_id=category_id, listing_count=n)
+            for city_id, category_id, n in rows
+        ],
+        batch_size=1000,
+    )
+    return len(rows)
+
+
+# ==========================================================
+# LISTING QUERIES
+# The hot view queries live here so the indexes on Listing and
+# `manage.py check_query_plans` always describe the same SQL.
+# ==========================================================
+class ListingQuerySet(models.QuerySet):
+    def newest(self):
+        return self.order_by("-id")
+
+    def featured(self):
+        return self.filter(featured=True).order_by("-id")
+
+    def in_category(self, category):
+        return self.filter(category=category).order_by("-id")
+
+    def in_city(self, city, category=None):
+        qs = self.filter(location=city)
+        if category is not None:
+            qs = qs.filter(category=category)
+        return qs.order_by("-id")
+
+    def in_location(self, city="", state=""):
+        # Free-text search input, matched through the alias table so
+        # "Calicut" finds Kozhikode listings and the location index applies
+        if city:
+            aliases = CityAlias.objects.filter(alias=location_key(city))
+            if state:
+                aliases = aliases.filter(state_key=slugify(location_key(state)))
+            return self.filter(location__in=aliases.values("city"))
+        if state:
+            cities = City.objects.filter(state__slug=slugify(location_key(state)))
+            return self.filter(location__in=cities.values("pk"))
+        return self
+
+
 # ==========================================================
 # LISTING (Business page)
 # Clean modern business profile page
@@ -71,7 +274,12 @@ class Listing(models.Model):
     slug = models.SlugField(unique=True, blank=True)
 
     description = models.TextField()
-    image = models.ImageField(upload_to='listings/', blank=True, null=True)
+    image = models.ImageField(
+        upload_to='listings/',
+        storage=content_addressed_storage,
+        blank=True,
+        null=True,
+    )
 
     phone = models.CharField(max_length=50, blank=True)
     email = models.EmailField(blank=True)
@@ -91,8 +299,79 @@ class Listing(models.Model):
     city = models.CharField(max_length=120, blank=True)
     state = models.CharField(max_length=120, blank=True)
 
+    # Normalized city, resolved from city/state on save
+    location = models.ForeignKey(
+        City,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="listings"
+    )
+
+    # Set when RELATED_FIELDS change; cleared by `manage.py build_related_listings`
+    related_stale = models.BooleanField(default=True, editable=False)
+
+    # Normalized contact details for duplicate detection (main.contacts)
+    phone_key = models.CharField(max_length=20, blank=True, db_index=True, editable=False)
+    email_key = models.CharField(max_length=254, blank=True, db_index=True, editable=False)
+    website_key = models.CharField(max_length=200, blank=True, db_index=True, editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = ListingQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # home: featured=True ORDER BY -id. Partial, because Django
+            # emits a bare `WHERE featured`, which SQLite won't match
+            # against a (featured, id) index.
+            models.Index(
+                fields=["-id"],
+                condition=models.Q(featured=True),
+                name="listing_featured_id_idx",
+            ),
+            # category_listings: category ORDER BY -id
+            models.Index(fields=["category", "-id"], name="listing_category_id_idx"),
+            # city pages (/city/<slug>/, /city/<slug>/<category>/) and search
+            models.Index(fields=["location", "-id"], name="listing_location_id_idx"),
+            models.Index(
+                fields=["location", "category", "-id"],
+                name="listing_location_cat_id_idx",
+            ),
+        ]
+
+    # Inputs of the related-listings build; editing one marks the listing stale
+    RELATED_FIELDS = ("title", "description", "category_id")
+    # Inputs of the LSH buckets; main.signals reindexes only when these change
+    DEDUPE_FIELDS = ("title", "address")
+    # Free text behind `location`; re-resolved only when these change, so a
+    # location corrected in the admin is kept
+    LOCATION_FIELDS = ("city", "state")
+    # Keys of the per-city / per-city-category counts kept by main.signals
+    COUNTED_FIELDS = ("location_id", "category_id")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot()
+        return instance
+
+    def _snapshot(self):
+        fields = self.RELATED_FIELDS + self.DEDUPE_FIELDS + self.LOCATION_FIELDS + self.COUNTED_FIELDS
+        self._loaded_values = {f: self.__dict__.get(f) for f in fields}
+
+    def has_changed(self, *fields):
+        """True if any of ``fields`` differs from when the row was loaded or saved."""
+        loaded = getattr(self, "_loaded_values", None)
+        if self._state.adding or loaded is None:
+            return True
+        return any(getattr(self, f) != loaded.get(f) for f in fields)
+
+    def loaded(self, field):
+        """Value of ``field`` when the row was loaded or last saved."""
+        loaded = getattr(self, "_loaded_values", None)
+        return getattr(self, field) if loaded is None else loaded.get(field)
+
     def save(self, *args, **kwargs):
         # Auto-generate unique slug
         if not self.slug:
@@ -107,7 +386,16 @@ class Listing(models.Model):
 
             self.slug = slug_temp
 
+        if self.has_changed(*self.LOCATION_FIELDS):
+            self.location = City.objects.resolve(self.city, self.state)
+        if self.has_changed(*self.RELATED_FIELDS):
+            self.related_stale = True
+
+        for field, value in contact_keys(self.phone, self.email, self.website).items():
+            setattr(self, field, value)
+
         super().save(*args, **kwargs)
+        self._snapshot()
 
     def __str__(self):
         return self.title
@@ -117,6 +405,115 @@ class Listing(models.Model):
         return reverse("business_page", args=[self.slug])
 
 
+# ==========================================================
+# LISTING DAILY STATS
+# One row per listing per day; written in batches by main.tracking
+# ==========================================================
+class ListingDailyStats(models.Model):
+    listing = models.ForeignKey(
+        Listing,
+        on_delete=models.CASCADE,
+        related_name="daily_stats"
+    )
+    day = models.DateField()
+
+    views = models.PositiveIntegerField(default=0)
+    call_clicks = models.PositiveIntegerField(default=0)
+    whatsapp_clicks = models.PositiveIntegerField(default=0)
+    website_clicks = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "Listing daily stats"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["listing", "day"],
+                name="unique_listing_day_stats",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.listing} - {self.day}"
+
+
+# ==========================================================
+# LSH BUCKETS (near-duplicate detection)
+# MinHash band hashes of title + address, one row per band
+# ==========================================================
+class ListingLSHBucket(models.Model):
+    listing = models.ForeignKey(
+        Listing,
+        on_delete=models.CASCADE,
+        related_name="lsh_buckets"
+    )
+    bucket = models.BigIntegerField(db_index=True)
+
+    def __str__(self):
+        return f"{self.listing_id}: {self.bucket}"
+
+
+# ==========================================================
+# RELATED LISTINGS ("Similar businesses")
+# Top-k neighbours per listing, precomputed by main.recommendations
+# ==========================================================
+class RelatedListing(models.Model):
+    listing = models.ForeignKey(
+        Listing,
+        on_delete=models.CASCADE,
+        related_name="related_listings"
+    )
+    related = models.ForeignKey(
+        Listing,
+        on_delete=models.CASCADE,
+        related_name="+"
+    )
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ["listing", "rank"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["listing", "rank"],
+                name="unique_related_listing_rank",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.listing} -> {self.related} ({self.score:.2f})"
+
+
+# ==========================================================
+# CHANGE LOG (partner sync feed)
+# Append-only; the auto-increment id is the feed cursor.
+# Deletes are kept as tombstones. Written by main.signals.
+# ==========================================================
+class ChangeLogEntry(models.Model):
+    MODEL_CHOICES = [
+        ("listing", "Listing"),
+        ("category", "Category"),
+    ]
+    ACTION_CHOICES = [
+        ("create", "Create"),
+        ("update", "Update"),
+        ("delete", "Delete"),
+    ]
+
+    model = models.CharField(max_length=20, choices=MODEL_CHOICES)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    changed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name_plural = "Change log"
+        indexes = [
+            # compaction: latest entry per object
+            models.Index(fields=["model", "object_id", "-id"], name="changelog_object_idx"),
+        ]
+
+    def __str__(self):
+        return f"#{self.pk} {self.action} {self.model} {self.object_id}"
+
+
 # ==========================================================
 # CONTACT MESSAGE
 # ==========================================================
@@ -0,0 +1,207 @@
+import math
+import re
+from collections import Counter
+
+import numpy as np
+import scipy.sparse as sp
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Listing, RelatedListing
+
+
+# ==========================================================
+# SIMILAR BUSINESSES
+# TF-IDF over title + description + category, cosine top-k
+# neighbours computed in row batches, stored in RelatedListing.
+# Run by `manage.py build_related_listings` (never per request).
+# ==========================================================
+TOP_K = 6
+MIN_SCORE = 0.05
+
+TITLE_WEIGHT = 2
+CATEGORY_WEIGHT = 3
+
+# Dense similarity cells per batch (float32): bounds memory to ~16 MB
+BATCH_CELLS = 4_000_000
+
+TOKEN_RE = re.compile(r"[a-z0-9]{2,}")
+STOP_WORDS = frozenset("""
+    an and are as at be by for from has have in is it its of on or our
+    the to we with you your all any can more most new best near
+""".split())
+
+
+def tokenize(title, description, category_id):
+    words = TOKEN_RE.findall(title.lower()) * TITLE_WEIGHT
+    words += TOKEN_RE.findall(description.lower())
+    tokens = [w for w in words if w not in STOP_WORDS]
+    if category_id:
+        tokens += [f"__category_{category_id}"] * CATEGORY_WEIGHT
+    return tokens
+
+
+def build_matrix(rows):
+    """
+    rows: iterable of (id, title, description, category_id).
+    Returns (ids, X) where X is an L2-normalized CSR TF-IDF matrix.
+    """
+    ids, indptr, indices, data = [], [0], [], []
+    vocabulary = {}
+
+    for listing_id, title, description, category_id in rows:
+        ids.append(listing_id)
+        for token, count in Counter(tokenize(title, description, category_id)).items():
+            indices.append(vocabulary.setdefault(token, len(vocabulary)))
+            data.append(1.0 + math.log(count))  # sublinear tf
+        indptr.append(len(indices))
+
+    n = len(ids)
+    X = sp.csr_matrix(
+        (np.array(data, dtype=np.float32), np.array(indices), np.array(indptr)),
+        shape=(n, len(vocabulary)),
+    )
+
+    df = np.bincount(X.indices, minlength=X.shape[1])
+    idf = np.log((1 + n) / (1 + df)).astype(np.float32) + 1
+    X = X @ sp.diags(idf)
+
+    norms = np.sqrt(np.asarray(X.multiply(X).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    X = sp.diags(1 / norms) @ X
+
+    return np.array(ids), X.tocsr()
+
+
+def top_k_neighbours(X, rows, k=TOP_K):
+    """Yield (row, [(col, score), ...]) for each row index in ``rows``."""
+    n = X.shape[0]
+    if n < 2:
+        for row in rows:
+            yield row, []
+        return
+
+    k = min(k, n - 1)
+    batch = max(1, BATCH_CELLS // n)
+    XT = X.T.tocsc()
+
+    for start in range(0, len(rows), batch):
+        chunk = np.asarray(rows[start:start + batch])
+        sims = (X[chunk] @ XT).toarray()
+        sims[np.arange(len(chunk)), chunk] = 0  # not your own neighbour
+
+        top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        for i, row in enumerate(chunk):
+            cols = top[i][np.argsort(-sims[i, top[i]])]
+            yield row, [
+                (col, float(sims[i, col])) for col in cols if sims[i, col] >= MIN_SCORE
+            ]
+
+
+def _affected_rows(X, ids, dirty_rows, k):
+    """
+    Rows whose stored top-k may change because ``dirty_rows`` changed:
+    the dirty rows themselves, rows that currently list one of them, and
+    rows for which a dirty listing now beats their k-th stored score.
+    """
+    position = {listing_id: row for row, listing_id in enumerate(ids)}
+    dirty_ids = [int(ids[row]) for row in dirty_rows]
+
+    affected = set(dirty_rows)
+    for start in range(0, len(dirty_ids), 500):
+        listing_ids = RelatedListing.objects.filter(
+            related_id__in=dirty_ids[start:start + 500]
+        ).values_list("listing_id", flat=True)
+        affected.update(position[i] for i in listing_ids if i in position)
+
+    # A full list's k-th (lowest) score is the bar a dirty listing must beat;
+    # shorter lists take anything above MIN_SCORE
+    threshold = np.full(len(ids), MIN_SCORE, dtype=np.float32)
+    for listing_id, score in RelatedListing.objects.filter(rank=k).values_list(
+        "listing_id", "score"
+    ):
+        row = position.get(listing_id)
+        if row is not None:
+            threshold[row] = score
+
+    # Best similarity of each listing to any dirty listing, in batches
+    best = np.zeros(len(ids), dtype=np.float32)
+    XT = X.T.tocsc()
+    batch = max(1, BATCH_CELLS // len(ids))
+    for start in range(0, len(dirty_rows), batch):
+        chunk = np.asarray(dirty_rows[start:start + batch])
+        np.maximum(best, (X[chunk] @ XT).max(axis=0).toarray().ravel(), out=best)
+
+    affected.update(np.flatnonzero(best > threshold).tolist())
+    return sorted(affected)
+
+
+def rebuild_related(full=False, k=TOP_K):
+    """
+    Recompute stored neighbours. Incremental by default: only listings
+    flagged ``related_stale`` and the listings they can displace are
+    recomputed. Returns (listings recomputed, rows written).
+    """
+    # Remember what each stale listing looked like; its flag is cleared with
+    # the write below only if it still looks like that
+    dirty = {}
+
+    def read_rows():
+        rows = Listing.objects.order_by("pk").values_list(
+            "pk", "title", "description", "category_id", "related_stale"
+        )
+        for listing_id, title, description, category_id, stale in rows.iterator():
+            if stale:
+                dirty[listing_id] = (title, description, category_id)
+            yield listing_id, title, description, category_id
+
+    ids, X = build_matrix(read_rows())
+    if not len(ids):
+        return 0, 0
+
+    dirty_rows = [row for row, listing_id in enumerate(ids) if listing_id in dirty]
+    if full or len(dirty_rows) * 2 > len(ids):
+        targets = list(range(len(ids)))
+    elif dirty_rows:
+        targets = _affected_rows(X, ids, dirty_rows, k)
+    else:
+        return 0, 0
+
+    objs = [
+        RelatedListing(
+            listing_id=int(ids[row]),
+            related_id=int(ids[col]),
+            rank=rank,
+            score=score,
+        )
+        for row, neighbours in top_k_neighbours(X, targets, k)
+        for rank, (col, score) in enumerate(neighbours, start=1)
+    ]
+
+    with transaction.atomic():
+        if len(targets) == len(ids):
+            RelatedListing.objects.all().delete()
+        else:
+            target_ids = [int(ids[row]) for row in targets]
+            for start in range(0, len(target_ids), 500):
+                RelatedListing.objects.filter(
+                    listing_id__in=target_ids[start:start + 500]
+                ).delete()
+        RelatedListing.objects.bulk_create(objs, batch_size=1000)
+        _clear_stale(dirty)
+
+    return len(targets), len(objs)
+
+
+def _clear_stale(snapshot):
+    """
+    Clear related_stale on listings whose title/description/category still
+    match ``snapshot`` ({pk: values read}); ones edited during the run
+    stay flagged for the next build.
+    """
+    items = list(snapshot.items())
+    for start in range(0, len(items), 100):
+        match = Q(pk__in=[])
+        for pk, (title, description, category_id) in items[start:start + 100]:
+            match |= Q(pk=pk, title=title, description=description, category_id=category_id)
+        Listing.objects.filter(match).update(related_stale=False)
@@ -0,0 +1,133 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import changefeed, dedupe
+from .models import Category, City, CityCategoryCount, Listing
+
+
+# ==========================================================
+# PER-CITY LISTING COUNTS
+# City.listing_count and CityCategoryCount are kept in step with
+# Listing writes so city pages never COUNT(*).
+# Bulk updates bypass signals; `backfill_locations` recounts.
+# ==========================================================
+def _bump(city_id, delta):
+    if not city_id:
+        return
+    cities = City.objects.filter(pk=city_id)
+    if delta < 0:
+        cities = cities.filter(listing_count__gte=-delta)
+    cities.update(listing_count=F("listing_count") + delta)
+
+
+def _bump_category(city_id, category_id, delta):
+    if not city_id or not category_id:
+        return
+    counts = CityCategoryCount.objects.filter(city_id=city_id, category_id=category_id)
+    if delta < 0:
+        counts.filter(listing_count__gte=-delta).update(listing_count=F("listing_count") + delta)
+        return
+    if counts.update(listing_count=F("listing_count") + delta):
+        return
+    try:
+        with transaction.atomic():
+            CityCategoryCount.objects.create(
+                city_id=city_id, category_id=category_id, listing_count=delta
+            )
+    except IntegrityError:
+        # Another request created the row first
+        counts.update(listing_count=F("listing_count") + delta)
+
+
+@receiver(post_save, sender=Listing)
+def listing_saved(sender, instance, created, **kwargs):
+    # Runs before Listing.save() refreshes its snapshot, so loaded() is the old row
+    old = (None, None) if created else tuple(map(instance.loaded, Listing.COUNTED_FIELDS))
+    new = (instance.location_id, instance.category_id)
+
+    if old[0] != new[0]:
+        _bump(old[0], -1)
+        _bump(new[0], 1)
+    if old != new:
+        _bump_category(*old, -1)
+        _bump_category(*new, 1)
+
+
+@receiver(post_delete, sender=Listing)
+def listing_deleted(sender, instance, **kwargs):
+    _bump(instance.loaded("location_id"), -1)
+    _bump_category(instance.loaded("location_id"), instance.loaded("category_id"), -1)
+
+
+# ==========================================================
+# RELATED LISTINGS
+# A deleted listing drops out of other listings' neighbour lists
+# (CASCADE); flag those listings so the next incremental build refills them.
+# ==========================================================
+@receiver(pre_delete, sender=Listing)
+def listing_deleting(sender, instance, **kwargs):
+    Listing.objects.filter(
+        related_listings__related=instance
+    ).update(related_stale=True)
+
+
+@receiver(pre_delete, sender=Category)
+def category_clearing(sender, instance, **kwargs):
+    # SET_NULL rewrites category_id without Listing.save()
+    Listing.objects.filter(category=instance).update(related_stale=True)
+
+
+# ==========================================================
+# CHANGE FEED
+# Every Listing / Category write lands in ChangeLogEntry; deletes
+# leave a tombstone. Renaming or deleting a category also logs an
+# update for its listings, whose payload carries the category slug.
+# ==========================================================
+@receiver(post_save, sender=Listing)
+@receiver(post_save, sender=Category)
+def log_saved(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        changefeed.record(instance, "create" if created else "update")
+
+
+@receiver(post_delete, sender=Listing)
+@receiver(post_delete, sender=Category)
+def log_deleted(sender, instance, **kwargs):
+    changefeed.record(instance, "delete")
+
+
+@receiver(pre_save, sender=Category)
+def category_renaming(sender, instance, raw=False, **kwargs):
+    # Listing payloads carry the category slug
+    if raw or instance.pk is None:
+        return
+    old_slug = Category.objects.filter(pk=instance.pk).values_list("slug", flat=True).first()
+    if old_slug is not None and old_slug != instance.slug:
+        changefeed.record_many(
+            Listing,
+            Listing.objects.filter(category=instance).values_list("pk", flat=True),
+            "update",
+        )
+
+
+@receiver(pre_delete, sender=Category)
+def category_deleting(sender, instance, **kwargs):
+    changefeed.record_many(
+        Listing,
+        Listing.objects.filter(category=instance).values_list("pk", flat=True),
+        "update",
+    )
+
+
+# ==========================================================
+# DUPLICATE DETECTION
+# Keep the listing's MinHash LSH buckets in step with its title/address.
+# ==========================================================
+@receiver(post_save, sender=Listing)
+def listing_reindex(sender, instance, created, raw=False, **kwargs):
+    # Runs before Listing.save() refreshes its snapshot, so has_changed still
+    # compares against the loaded row
+    if not raw and (created or instance.has_changed(*Listing.DEDUPE_FIELDS)):
+        dedupe.index_listing(instance)
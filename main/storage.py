@@ -0,0 +1,97 @@
+import hashlib
+import os
+import re
+import uuid
+
+from django.apps import apps
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db import models
+from django.utils.deconstruct import deconstructible
+
+
+# ==========================================================
+# CONTENT-ADDRESSED MEDIA STORAGE
+# Uploads are stored as <upload_to>/<aa>/<sha256><ext>, so the
+# same file uploaded twice is written to disk only once.
+# ==========================================================
+BLOB_NAME_RE = re.compile(r"^[0-9a-f]{2}/([0-9a-f]{64})(\.[A-Za-z0-9]+)?$")
+
+
+def content_hash(content):
+    """Return the hex SHA-256 of a Django ``File``, leaving it rewound."""
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    if hasattr(content, "seek"):
+        content.seek(0)
+    return digest.hexdigest()
+
+
+def blob_name(directory, digest, original_name):
+    ext = os.path.splitext(original_name)[1].lower()
+    return "/".join(p for p in (directory, digest[:2], digest + ext) if p)
+
+
+def is_blob_name(name):
+    """True if ``name`` (relative to its upload_to) is a CAS blob path."""
+    parts = name.replace("\\", "/").split("/")
+    return bool(BLOB_NAME_RE.match("/".join(parts[-2:])))
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    FileSystemStorage that names files by the SHA-256 of their content.
+
+    ``save()`` hashes the upload first; if a blob with that hash already
+    exists it is reused instead of writing a renamed copy, and a blob
+    written concurrently is replaced in place, never suffixed. Blobs are never
+    deleted on save/replace — unreferenced ones are removed by
+    ``manage.py gc_media``.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+
+        directory = os.path.dirname(name).replace("\\", "/")
+        name = blob_name(directory, content_hash(content), name)
+
+        if self.exists(name):
+            # Touch the reused blob so gc_media's grace period covers the
+            # row that is about to reference it
+            os.utime(self.path(name))
+            return name
+        return super().save(name, content, max_length=max_length)
+
+    def get_available_name(self, name, max_length=None):
+        # A blob that appeared since save() checked holds the same bytes;
+        # never suffix it into a name gc_media doesn't recognise
+        if is_blob_name(name):
+            return name
+        return super().get_available_name(name, max_length=max_length)
+
+    def _save(self, name, content):
+        if not is_blob_name(name):
+            return super()._save(name, content)
+        # Write under a private name and rename over the blob, so concurrent
+        # identical uploads each publish a complete file under the one name
+        tmp = super()._save(f"{name}.{uuid.uuid4().hex}.tmp", content)
+        os.replace(self.path(tmp), self.path(name))
+        return name
+
+
+content_addressed_storage = ContentAddressedStorage()
+
+
+def content_addressed_fields():
+    """Yield (model, field) for every FileField backed by CAS storage."""
+    for model in apps.get_models():
+        for field in model._meta.get_fields():
+            if isinstance(field, models.FileField) and isinstance(
+                field.storage, ContentAddressedStorage
+            ):
+                yield model, field
@@ -1,3 +1,658 @@
-from django.test import TestCase
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.core.files.base import ContentFile
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError, OperationalError
+from django.test import TestCase, override_settings
+
+from . import changefeed, dedupe, recommendations, tracking, warmup
+from .management.commands import check_query_plans, startup_profile
+from .models import (
+    Category, City, CityAlias, CityCategoryCount, Listing, ListingDailyStats,
+    ListingLSHBucket, RelatedListing,
+)
+from .storage import content_addressed_storage, is_blob_name
+
+
+# ============================================================
+# Requests go through TrackingMiddleware, which would start the
+# background flush thread; tests that use the client patch it out
+# and call tracking.flush() themselves.
+# ============================================================
+class ClientTestCase(TestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(tracking, "start_flusher")
+        self.start_flusher = patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+# ============================================================
+# CONTENT-ADDRESSED STORAGE
+# ============================================================
+class MediaTestCase(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root)
+
+    def age(self, name, days=3):
+        old = time.time() - days * 86400
+        os.utime(content_addressed_storage.path(name), (old, old))
+
+
+class ContentAddressedStorageTests(MediaTestCase):
+
+    def test_identical_uploads_share_one_blob(self):
+        first = content_addressed_storage.save("listings/a.PNG", ContentFile(b"same"))
+        second = content_addressed_storage.save("listings/b.png", ContentFile(b"same"))
+
+        self.assertEqual(first, second)
+        self.assertRegex(first, r"^listings/[0-9a-f]{2}/[0-9a-f]{64}\.png$")
+
+    def test_reused_blob_mtime_is_refreshed(self):
+        name = content_addressed_storage.save("listings/a.png", ContentFile(b"x"))
+        path = content_addressed_storage.path(name)
+        old = time.time() - 3 * 86400
+        os.utime(path, (old, old))
+
+        content_addressed_storage.save("listings/b.png", ContentFile(b"x"))
+
+        self.assertGreater(os.path.getmtime(path), old + 86400)
+
+    def test_concurrent_identical_upload_reuses_blob_name(self):
+        name = content_addressed_storage.save("listings/a.png", ContentFile(b"x"))
+        # The other upload wrote the blob after this one checked exists()
+        with mock.patch.object(content_addressed_storage, "exists", return_value=False):
+            again = content_addressed_storage.save("listings/b.png", ContentFile(b"x"))
+
+        self.assertEqual(again, name)
+        shard = os.path.dirname(content_addressed_storage.path(name))
+        self.assertEqual(os.listdir(shard), [os.path.basename(name)])
+
+
+class MediaCommandsTests(MediaTestCase):
+    def blob(self, data):
+        return content_addressed_storage.save("listings/x.png", ContentFile(data))
+
+    def legacy(self, filename, data=b"old"):
+        os.makedirs(os.path.join(self.media_root, "listings"), exist_ok=True)
+        with open(os.path.join(self.media_root, "listings", filename), "wb") as f:
+            f.write(data)
+        return f"listings/{filename}"
+
+    def gc(self, *args):
+        call_command("gc_media", *args, stdout=StringIO())
+
+    def test_gc_keeps_referenced_and_recent_blobs(self):
+        referenced, orphan, fresh = self.blob(b"a"), self.blob(b"b"), self.blob(b"c")
+        self.age(referenced)
+        self.age(orphan)
+        Listing.objects.create(title="Paragon", description="x", image=referenced)
+
+        self.gc()
+
+        self.assertTrue(content_addressed_storage.exists(referenced))
+        self.assertFalse(content_addressed_storage.exists(orphan))
+        self.assertTrue(content_addressed_storage.exists(fresh))
+
+    def test_gc_removes_legacy_files_only_with_flag(self):
+        self.blob(b"a")
+        referenced, orphan = self.legacy("kept.png"), self.legacy("gone.png")
+        self.age(referenced)
+        self.age(orphan)
+        Listing.objects.create(title="Paragon", description="x", image=referenced)
+
+        self.gc()
+        self.assertTrue(content_addressed_storage.exists(orphan))
+
+        self.gc("--legacy")
+        self.assertTrue(content_addressed_storage.exists(referenced))
+        self.assertFalse(content_addressed_storage.exists(orphan))
+
+    def test_migrate_rewrites_rows_to_blobs(self):
+        self.blob(b"a")
+        original = self.legacy("kell.png", b"a")
+        listing = Listing.objects.create(title="Kell", description="x", image=original)
+
+        call_command("migrate_media_to_cas", "--delete-originals", stdout=StringIO())
+
+        listing.refresh_from_db()
+        self.assertTrue(is_blob_name(listing.image.name))
+        self.assertTrue(content_addressed_storage.exists(listing.image.name))
+        self.assertFalse(content_addressed_storage.exists(original))
+
+    def test_migrate_logs_rewritten_rows_in_change_feed(self):
+        listing = Listing.objects.create(
+            title="Kell", description="x", image=self.legacy("kell.png")
+        )
+        _, cursor, _ = changefeed.read_changes(0)
+
+        call_command("migrate_media_to_cas", stdout=StringIO())
+
+        changes, _, _ = changefeed.read_changes(cursor)
+        self.assertEqual([(c["id"], c["action"]) for c in changes], [(listing.pk, "update")])
+        self.assertRegex(changes[0]["data"]["image"], r"/listings/[0-9a-f]{2}/[0-9a-f]{64}\.png$")
+
+
+# ============================================================
+# BATCHED VIEW / CLICK TRACKING
+# ============================================================
+class TrackingTests(ClientTestCase):
+    def setUp(self):
+        super().setUp()
+        tracking.flush()  # start from an empty buffer
+        self.listing = Listing.objects.create(title="Paragon", description="Biryani")
+
+    def stats(self):
+        return ListingDailyStats.objects.get(listing=self.listing)
+
+    def test_record_is_memory_only_until_flush(self):
+        tracking.record(self.listing.pk, "view")
+        tracking.record(self.listing.pk, "view")
+        tracking.record(self.listing.pk, "call")
+        tracking.record(self.listing.pk, "bogus")
+
+        self.assertFalse(ListingDailyStats.objects.exists())
+        self.assertEqual(tracking.flush(), 1)
+
+        stats = self.stats()
+        self.assertEqual((stats.views, stats.call_clicks), (2, 1))
+
+    def test_flush_increments_existing_row(self):
+        tracking.record(self.listing.pk, "website")
+        tracking.flush()
+        tracking.record(self.listing.pk, "website")
+        tracking.flush()
+
+        self.assertEqual(self.stats().website_clicks, 2)
+
+    def test_events_for_deleted_listings_are_dropped(self):
+        tracking.record(self.listing.pk + 1000, "view")
+        self.assertEqual(tracking.flush(), 0)
+        self.assertFalse(ListingDailyStats.objects.exists())
+
+    def test_failed_flush_keeps_counts_for_retry(self):
+        tracking.record(self.listing.pk, "whatsapp")
+        with mock.patch.object(tracking, "_write", side_effect=OperationalError):
+            with self.assertLogs("main.tracking", "ERROR"):
+                self.assertEqual(tracking.flush(), 0)
+
+        tracking.flush()
+        self.assertEqual(self.stats().whatsapp_clicks, 1)
+
+    def test_unwritable_row_is_dropped_not_retried_forever(self):
+        tracking.record(10 ** 25, "call")
+        tracking.record(self.listing.pk, "call")
+
+        with self.assertLogs("main.tracking", "ERROR"):
+            self.assertEqual(tracking.flush(), 1)
+
+        self.assertEqual(self.stats().call_clicks, 1)
+        self.assertEqual(tracking.flush(), 0)
+
+    def test_track_endpoint_rejects_out_of_range_ids(self):
+        response = self.client.post(f"/track/{10 ** 25}/call/")
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(tracking.flush(), 0)
+
+    def test_full_buffer_wakes_flusher(self):
+        tracking._wake.clear()
+        with mock.patch.object(tracking, "MAX_PENDING", 1):
+            tracking.record(self.listing.pk, "view")
+        self.assertTrue(tracking._wake.is_set())
+        tracking.flush()
+
+    def test_track_endpoint_only_buffers(self):
+        response = self.client.post(f"/track/{self.listing.pk}/call/")
+
+        self.assertEqual(response.status_code, 204)
+        self.start_flusher.assert_called()
+        self.assertFalse(ListingDailyStats.objects.exists())
+        tracking.flush()
+        self.assertEqual(self.stats().call_clicks, 1)
+
+
+# ============================================================
+# WORKER WARM-UP / STARTUP PROFILE
+# connections.close_all is patched: closing the test connection
+# would break the test's transaction.
+# ============================================================
+@mock.patch.object(warmup.connections, "close_all")
+class WarmUpTests(TestCase):
+    def test_all_steps_run_cleanly(self, close_all):
+        Listing.objects.create(title="Paragon", description="Biryani")
+
+        with self.assertNoLogs("main.warmup", "ERROR"):
+            timings = warmup.warm_up()
+
+        self.assertEqual(list(timings), [name for name, _ in warmup.STEPS])
+        close_all.assert_called_once()
+
+    def test_failing_step_does_not_stop_boot(self, close_all):
+        ran = []
+        steps = (
+            ("broken", mock.Mock(side_effect=RuntimeError("no database"))),
+            ("after", lambda: ran.append("after")),
+        )
+        with mock.patch.object(warmup, "STEPS", steps):
+            with self.assertLogs("main.warmup", "ERROR"):
+                timings = warmup.warm_up()
+
+        self.assertEqual(list(timings), ["broken", "after"])
+        self.assertEqual(ran, ["after"])
+        close_all.assert_called_once()
+
+
+class StartupProfileTests(TestCase):
+    def test_parse_importtime(self):
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |     encodings.utf_8\n"
+            "import time:       300 |        420 |   encodings\n"
+            "import time:      5000 |       5000 | numpy\n"
+            "unrelated stderr line\n"
+        )
+        modules, packages = startup_profile.Command.parse_importtime(output)
+
+        self.assertEqual(modules["encodings"], (300, 420))
+        self.assertEqual(dict(packages), {"encodings": 420, "numpy": 5000})
+
+    def test_failed_boot_raises_command_error(self):
+        failed = subprocess.CompletedProcess([], 1, stdout="", stderr="ImportError: boom")
+        with mock.patch.object(startup_profile.subprocess, "run", return_value=failed):
+            with self.assertRaisesMessage(CommandError, "ImportError: boom"):
+                call_command("startup_profile", stdout=StringIO())
+
+
+# ============================================================
+# LOCATIONS
+# ============================================================
+class LocationTests(ClientTestCase):
+    def test_same_city_name_in_two_states_is_two_cities(self):
+        a = City.objects.resolve("Aurangabad", "Maharashtra")
+        b = City.objects.resolve("aurangabad ", "Bihar")
+
+        self.assertNotEqual(a, b)
+        self.assertEqual(City.objects.resolve("Aurangabad", "maharashtra"), a)
+        self.assertEqual(b.state.slug, "bihar")
+
+    def test_blank_state_reuses_unambiguous_city(self):
+        kochi = City.objects.resolve("Kochi", "Kerala")
+        self.assertEqual(City.objects.resolve("kochi"), kochi)
+
+    def test_lost_create_race_returns_alias_city(self):
+        winner = City.objects.resolve("Kochi", "Kerala")
+        with mock.patch.object(CityAlias.objects, "filter") as filter_:
+            # The lookup misses, as if the other request hadn't committed yet
+            filter_.return_value.filter.return_value.first.return_value = None
+            self.assertEqual(City.objects.resolve("Kochi", "Kerala"), winner)
+        self.assertEqual(City.objects.count(), 1)
+
+    def test_admin_location_correction_is_kept(self):
+        listing = Listing.objects.create(
+            title="Paragon", description="x", city="Kochi", state="Kerala"
+        )
+        kozhikode = City.objects.resolve("Kozhikode", "Kerala")
+
+        listing.location = kozhikode
+        listing.save()
+        listing.featured = True
+        # No alias lookup: the UPDATE plus its change-log entry (in a savepoint)
+        with self.assertNumQueries(4):
+            listing.save()
+
+        listing.refresh_from_db()
+        self.assertEqual(listing.location, kozhikode)
+
+    def test_city_category_counts_follow_listings(self):
+        hotels = Category.objects.create(name="Hotels", slug="hotels")
+        bakeries = Category.objects.create(name="Bakeries", slug="bakeries")
+        listing = Listing.objects.create(
+            title="Paragon", description="x", city="Kochi", state="Kerala", category=hotels
+        )
+        Listing.objects.create(title="Kayees", description="x", city="Kochi", state="Kerala")
+
+        def counts():
+            return dict(CityCategoryCount.objects.values_list("category__slug", "listing_count"))
+
+        self.assertEqual(counts(), {"hotels": 1})
+        listing.category = bakeries
+        listing.save()
+        self.assertEqual(counts(), {"hotels": 0, "bakeries": 1})
+
+        response = self.client.get(f"/city/{listing.location.slug}/bakeries/")
+        self.assertEqual(response.context["listing_count"], 1)
+        response = self.client.get(f"/city/{listing.location.slug}/")
+        self.assertEqual(response.context["listing_count"], 2)
+        self.assertEqual([c.category for c in response.context["categories"]], [bakeries])
+
+        listing.delete()
+        self.assertEqual(counts(), {"hotels": 0, "bakeries": 0})
+
+    def test_search_matches_aliases(self):
+        listing = Listing.objects.create(
+            title="Paragon", description="Biryani", city="Kozhikode", state="Kerala"
+        )
+        CityAlias.objects.create(alias="calicut", state_key="kerala", city=listing.location)
+
+        response = self.client.get("/search/", {"city": "Calicut", "state": "kerala"})
+
+        self.assertEqual(list(response.context["results"]), [listing])
+
+
+# ============================================================
+# RELATED LISTINGS
+# ============================================================
+class RelatedStaleTests(TestCase):
+    def setUp(self):
+        Listing.objects.create(title="Paragon", description="Biryani")
+        Listing.objects.update(related_stale=False)
+        self.listing = Listing.objects.get()
+
+    def test_toggling_featured_keeps_listing_fresh(self):
+        self.listing.featured = True
+        self.listing.save()
+        self.listing.refresh_from_db()
+        self.assertFalse(self.listing.related_stale)
+
+    def test_editing_description_marks_listing_stale(self):
+        self.listing.description = "Biryani and seafood"
+        self.listing.save()
+        self.listing.refresh_from_db()
+        self.assertTrue(self.listing.related_stale)
+
+
+class RecommendationTests(TestCase):
+    ROWS = [
+        (1, "Paragon", "Biryani and seafood", None),
+        (2, "Rahmath", "Beef biryani", None),
+        (3, "Kayees", "Mutton biryani", None),
+        (4, "Cochin Bakery", "Plum cakes", None),
+        (5, "Bakery Hut", "Cakes and puffs", None),
+        (6, "The", "", None),
+    ]
+
+    def neighbours(self, X, rows, k=2):
+        return {row: found for row, found in recommendations.top_k_neighbours(X, rows, k)}
+
+    def test_build_matrix_rows_are_unit_length(self):
+        ids, X = recommendations.build_matrix(self.ROWS)
+
+        self.assertEqual(ids.tolist(), [1, 2, 3, 4, 5, 6])
+        norms = np.sqrt(np.asarray(X.multiply(X).sum(axis=1)).ravel())
+        self.assertTrue(np.allclose(norms[:5], 1))
+        self.assertEqual(norms[5], 0)  # no tokens left after stop words
+
+    def test_top_k_excludes_self_and_weak_scores(self):
+        _, X = recommendations.build_matrix(self.ROWS)
+        found = self.neighbours(X, list(range(6)))
+
+        for row, pairs in found.items():
+            self.assertNotIn(row, [col for col, _ in pairs])
+            self.assertTrue(all(score >= recommendations.MIN_SCORE for _, score in pairs))
+        self.assertEqual({col for col, _ in found[0]}, {1, 2})  # the biryani places
+        self.assertEqual([col for col, _ in found[3]], [4])     # the other bakery only
+
+    def test_small_batches_give_the_same_neighbours(self):
+        _, X = recommendations.build_matrix(self.ROWS)
+        expected = self.neighbours(X, list(range(6)))
+
+        with mock.patch.object(recommendations, "BATCH_CELLS", 1):
+            self.assertEqual(self.neighbours(X, list(range(6))), expected)
+
+
+class RebuildRelatedTests(TestCase):
+    def setUp(self):
+        self.listings = {
+            title: Listing.objects.create(title=title, description=description)
+            for title, description in [
+                ("Paragon", "Biryani and seafood"),
+                ("Rahmath", "Beef biryani"),
+                ("Cochin Bakery", "Plum cakes"),
+                ("Bakery Hut", "Cakes and puffs"),
+            ]
+        }
+        recommendations.rebuild_related(full=True)
+
+    def edit(self, title, description):
+        listing = self.listings[title]
+        listing.description = description
+        listing.save()
+        return listing
+
+    def test_incremental_run_recomputes_only_affected_listings(self):
+        self.edit("Cochin Bakery", "Plum cakes and bread")
+        targets = []
+        real = recommendations.top_k_neighbours
+
+        def spy(X, rows, k):
+            targets.extend(rows)
+            return real(X, rows, k)
+
+        with mock.patch.object(recommendations, "top_k_neighbours", spy):
+            recomputed, _ = recommendations.rebuild_related()
+
+        ids = Listing.objects.order_by("pk").values_list("pk", flat=True)
+        self.assertEqual(
+            {ids[row] for row in targets},
+            {self.listings["Cochin Bakery"].pk, self.listings["Bakery Hut"].pk},
+        )
+        self.assertEqual(recomputed, 2)
+        self.assertFalse(Listing.objects.filter(related_stale=True).exists())
+
+    def test_failed_write_keeps_flags(self):
+        listing = self.edit("Paragon", "Biryani only")
+
+        with mock.patch.object(RelatedListing.objects, "bulk_create", side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                recommendations.rebuild_related()
+
+        listing.refresh_from_db()
+        self.assertTrue(listing.related_stale)
+
+    def test_edit_during_run_stays_flagged(self):
+        listing = self.edit("Paragon", "Biryani only")
+        real = recommendations.build_matrix
+
+        def edited_meanwhile(rows):
+            result = real(rows)
+            Listing.objects.filter(pk=listing.pk).update(description="Seafood only", related_stale=True)
+            return result
+
+        with mock.patch.object(recommendations, "build_matrix", edited_meanwhile):
+            recommendations.rebuild_related()
+
+        listing.refresh_from_db()
+        self.assertTrue(listing.related_stale)
+
+
+# ============================================================
+# CHANGE FEED
+# ============================================================
+class ChangeFeedTests(ClientTestCase):
+    def setUp(self):
+        super().setUp()
+        self.a = Listing.objects.create(title="Paragon", description="Biryani")
+        self.b = Listing.objects.create(title="Rahmath", description="Beef")
+        self.a.description = "Biryani and seafood"
+        self.a.save()
+
+    def test_updates_collapse_to_latest_state(self):
+        changes, cursor, has_more = changefeed.read_changes(0)
+
+        self.assertEqual(
+            [(c["id"], c["action"]) for c in changes],
+            [(self.b.pk, "create"), (self.a.pk, "update")],
+        )
+        self.assertEqual(changes[1]["data"]["description"], "Biryani and seafood")
+        self.assertEqual(cursor, changes[-1]["seq"])
+        self.assertFalse(has_more)
+
+    def test_cursor_pages_through_the_log(self):
+        first, cursor, has_more = changefeed.read_changes(0, limit=1)
+        self.assertEqual([c["id"] for c in first], [self.a.pk])
+        self.assertTrue(has_more)
+
+        rest, cursor, has_more = changefeed.read_changes(cursor, limit=10)
+        self.assertEqual([c["id"] for c in rest], [self.b.pk, self.a.pk])
+        self.assertFalse(has_more)
+
+        self.assertEqual(changefeed.read_changes(cursor), ([], cursor, False))
+
+    def test_category_rename_logs_its_listings(self):
+        category = Category.objects.create(name="Hotels", slug="hotels")
+        self.b.category = category
+        self.b.save()
+        _, cursor, _ = changefeed.read_changes(0)
+
+        category.slug = "restaurants"
+        category.save()
+
+        changes, _, _ = changefeed.read_changes(cursor)
+        listing = next(c for c in changes if c["model"] == "listing")
+        self.assertEqual((listing["id"], listing["data"]["category"]), (self.b.pk, "restaurants"))
+
+    def test_deletes_are_tombstones(self):
+        _, cursor, _ = changefeed.read_changes(0)
+        pk = self.b.pk
+        self.b.delete()
+
+        response = self.client.get("/api/changes/", {"since": cursor})
+
+        self.assertEqual(response.json()["changes"], [{
+            "seq": response.json()["next"],
+            "model": "listing",
+            "id": pk,
+            "action": "delete",
+            "data": None,
+        }])
+
+
+# ============================================================
+# DUPLICATE DETECTION
+# ============================================================
+class DuplicateDetectionTests(TestCase):
+    ROWS = (
+        "title,description,phone,address\n"
+        "Paragon Restaurant,Biryani,,\"Kannur Road, Kozhikode\"\n"
+        "Paragon Restaurant,Biryani,+91 98470 12345,Kannur Road Kozhikode\n"
+    )
+
+    def import_rows(self, *args, rows=ROWS, stderr=None):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as f:
+            f.write(rows)
+        self.addCleanup(os.remove, f.name)
+        out = StringIO()
+        call_command("import_listings", f.name, *args, stdout=out, stderr=stderr or StringIO())
+        return out.getvalue()
+
+    def test_invalid_rows_are_reported_per_line(self):
+        err = StringIO()
+        rows = (
+            "title,description,email,website\n"
+            "Paragon,Biryani,not-an-email,\n"
+            f"{'x' * 201},Too long,,\n"
+            "Rahmath,Beef,,notaurl\n"
+            "Kayees,Mutton,kayees@example.com,https://kayees.in\n"
+        )
+        out = self.import_rows(rows=rows, stderr=err)
+
+        self.assertEqual(
+            [line.split(":")[0] for line in err.getvalue().splitlines()],
+            ["line 2", "line 3", "line 4"],
+        )
+        self.assertIn("email: Enter a valid email address.", err.getvalue())
+        self.assertIn("1 created", out)
+        self.assertEqual(list(Listing.objects.values_list("title", flat=True)), ["Kayees"])
+
+    def test_database_error_rolls_back_whole_file(self):
+        real_save = Listing.save
+
+        def fail_second(listing, *args, **kwargs):
+            if Listing.objects.exists():
+                raise DatabaseError("disk full")
+            real_save(listing, *args, **kwargs)
+
+        rows = "title,description\nParagon,Biryani\nCochin Bakery,Plum cakes\n"
+        with mock.patch.object(Listing, "save", fail_second):
+            with self.assertRaisesMessage(CommandError, "line 3: disk full"):
+                self.import_rows(rows=rows)
+
+        self.assertFalse(Listing.objects.exists())
+
+    def test_reindex_rebuilds_keys_and_buckets(self):
+        listing = Listing.objects.create(title="Paragon", description="x", phone="098470 12345")
+        Listing.objects.update(phone_key="")
+        ListingLSHBucket.objects.all().delete()
+
+        call_command("find_duplicates", "--reindex", stdout=StringIO())
+
+        listing.refresh_from_db()
+        self.assertEqual(listing.phone_key, "9847012345")
+        self.assertEqual(
+            ListingLSHBucket.objects.filter(listing=listing).count(),
+            len(set(dedupe.buckets_for("Paragon"))),
+        )
+
+    def test_in_file_duplicate_merges_into_earlier_row(self):
+        out = self.import_rows("--on-duplicate", "merge")
+
+        self.assertIn("line 3: merged into line 2 (phone)", out)
+        self.assertEqual(Listing.objects.get().phone, "+91 98470 12345")
+
+    def test_in_file_duplicate_is_created_and_flagged(self):
+        out = self.import_rows("--on-duplicate", "create")
+
+        self.assertIn("line 3: possible duplicate of line 2, imported", out)
+        self.assertEqual(Listing.objects.count(), 2)
+
+    def test_candidate_cap_keeps_contact_matches(self):
+        Listing.objects.create(title="Paragon Restaurant", description="x")
+        with_phone = Listing.objects.create(
+            title="Paragon Restaurants", description="x", phone="9847012345"
+        )
+
+        with mock.patch.object(dedupe, "MAX_CANDIDATES", 1):
+            found = dedupe.find_similar("Paragon Restaurant", phone="098470 12345")
+
+        self.assertEqual([listing for listing, _, _ in found], [with_phone])
+
+    def test_buckets_reindexed_only_when_text_changes(self):
+        listing = Listing.objects.create(title="Paragon", description="Biryani")
+        with mock.patch.object(dedupe, "index_listing") as index_listing:
+            listing.featured = True
+            listing.save()
+            index_listing.assert_not_called()
+
+            listing.address = "Kannur Road"
+            listing.save()
+            index_listing.assert_called_once_with(listing)
+
+
+# ============================================================
+# QUERY PLAN CHECKER
+# ============================================================
+class CheckQueryPlansTests(TestCase):
+    def test_hot_queries_use_their_indexes(self):
+        out = StringIO()
+        call_command("check_query_plans", stdout=out)
+        self.assertNotIn("FAIL", out.getvalue())
+
+    def test_unindexed_sort_fails(self):
+        unsorted = [("sorted by title", lambda: Listing.objects.filter(category=0).order_by("title"), None)]
+        with mock.patch.object(check_query_plans, "HOT_QUERIES", unsorted):
+            with self.assertRaises(CommandError):
+                call_command("check_query_plans", stdout=StringIO())
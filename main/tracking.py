@@ -0,0 +1,167 @@
+import atexit
+import logging
+import os
+import threading
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import IntegrityError, InterfaceError, OperationalError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+
+logger = logging.getLogger(__name__)
+
+
+# ==========================================================
+# BATCHED VIEW / CLICK COUNTERS
+# Events are counted in memory per worker and written as
+# UPDATE ... SET n = n + k on ListingDailyStats by a background
+# thread, so a page view never costs a database write of its own.
+# ==========================================================
+EVENT_FIELDS = {
+    "view": "views",
+    "call": "call_clicks",
+    "whatsapp": "whatsapp_clicks",
+    "website": "website_clicks",
+}
+
+FLUSH_INTERVAL = getattr(settings, "TRACKING_FLUSH_INTERVAL", 30)
+MAX_PENDING = getattr(settings, "TRACKING_MAX_PENDING", 1000)
+
+_lock = threading.Lock()
+_pending = defaultdict(Counter)   # (listing_id, day) -> Counter(field -> n)
+_wake = threading.Event()
+_flusher_pid = None
+
+
+def valid_listing_id(listing_id):
+    """
+    True if ``listing_id`` fits the Listing pk column. Ids from the URL are
+    unbounded ints; one past the column's range would fail every flush.
+    """
+    from .models import Listing
+
+    _, high = connection.ops.integer_field_range(Listing._meta.pk.get_internal_type())
+    return 0 < listing_id and (high is None or listing_id <= high)
+
+
+def record(listing_id, event):
+    """Count one event for a listing. Unknown events are ignored."""
+    field = EVENT_FIELDS.get(event)
+    if field is None:
+        return
+
+    key = (listing_id, timezone.localdate())
+    with _lock:
+        _pending[key][field] += 1
+        full = len(_pending) >= MAX_PENDING
+    if full:
+        _wake.set()
+
+
+def start_flusher():
+    """
+    Start this process's background flush thread (once per pid, so a
+    worker forked from a --preload master gets its own thread).
+    """
+    global _flusher_pid
+
+    if _flusher_pid == os.getpid():
+        return
+    with _lock:
+        if _flusher_pid == os.getpid():
+            return
+        _flusher_pid = os.getpid()
+
+    threading.Thread(target=_flush_loop, name="tracking-flusher", daemon=True).start()
+
+
+def _flush_loop():
+    while True:
+        # Every FLUSH_INTERVAL seconds, or early once MAX_PENDING rows pile up
+        _wake.wait(FLUSH_INTERVAL)
+        _wake.clear()
+        flush()
+        # The thread's own connection; don't hold it open while idle
+        connection.close()
+
+
+def flush():
+    """Write all buffered counters to the database. Returns rows touched."""
+    global _pending
+
+    with _lock:
+        batch, _pending = _pending, defaultdict(Counter)
+
+    if not batch:
+        return 0
+
+    try:
+        return _write(batch)
+    except (OperationalError, InterfaceError):
+        # Database unreachable: every row can be retried on the next flush
+        logger.exception("Failed to flush listing stats; keeping them for retry")
+        _requeue(batch.items())
+        return 0
+    except Exception:
+        logger.exception("Failed to flush listing stats; writing rows one by one")
+
+    # Something in the batch can't be written; isolate it so one bad row
+    # doesn't block (and grow) the buffer forever
+    touched = 0
+    for key, counts in batch.items():
+        try:
+            touched += _write({key: counts})
+        except (OperationalError, InterfaceError):
+            _requeue([(key, counts)])
+        except Exception:
+            logger.exception("Dropping listing stats for %s on %s", *key)
+    return touched
+
+
+def _requeue(items):
+    with _lock:
+        for key, counts in items:
+            _pending[key].update(counts)
+
+
+def _write(batch):
+    from .models import Listing, ListingDailyStats
+
+    # Drop events for listings deleted since they were recorded
+    live_ids = set(
+        Listing.objects
+        .filter(pk__in={listing_id for listing_id, _ in batch})
+        .values_list("pk", flat=True)
+    )
+
+    touched = 0
+    with transaction.atomic():
+        for (listing_id, day), counts in batch.items():
+            if listing_id not in live_ids:
+                continue
+
+            increments = {field: F(field) + n for field, n in counts.items()}
+            rows = ListingDailyStats.objects.filter(
+                listing_id=listing_id, day=day
+            ).update(**increments)
+
+            if not rows:
+                try:
+                    with transaction.atomic():
+                        ListingDailyStats.objects.create(
+                            listing_id=listing_id, day=day, **counts
+                        )
+                except IntegrityError:
+                    # Another worker inserted the row first
+                    ListingDailyStats.objects.filter(
+                        listing_id=listing_id, day=day
+                    ).update(**increments)
+            touched += 1
+
+    return touched
+
+
+# Bound the loss on graceful worker shutdown (deploys, max-requests)
+atexit.register(flush)
@@ -1,13 +1,17 @@
 import os
 from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, JsonResponse
 from django.shortcuts import render, get_object_or_404, redirect
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from django.db.models import Q
 from django.contrib import messages
 from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import AuthenticationForm
 
-from .models import Listing, Category, CategoryTemplate
+from .models import Listing, Category, CategoryTemplate, City, RelatedListing
+from . import changefeed, tracking
 from .forms import ListingForm, ContactForm, RegisterForm, SearchForm, CategoryForm
 
 
@@ -37,10 +41,10 @@ def logout_user(request):
 # ============================================================
 def home(request):
     categories = Category.objects.all()
-    featured = Listing.objects.filter(featured=True).order_by("-id")[:6]
+    featured = Listing.objects.featured()[:6]
 
     if not featured.exists():
-        featured = Listing.objects.all().order_by("-id")[:6]
+        featured = Listing.objects.newest()[:6]
 
     return render(request, "main/home.html", {
         "categories": categories,
@@ -52,7 +56,7 @@ def home(request):
 # LISTINGS
 # ============================================================
 def listings(request):
-    results = Listing.objects.all().order_by("-id")
+    results = Listing.objects.newest()
     q = request.GET.get("q", "")
 
     if q:
@@ -65,8 +69,57 @@ def listings(request):
 # BUSINESS PAGE (DialAddress Style)
 # ============================================================
 def business_page(request, slug):
-    item = get_object_or_404(Listing, slug=slug)
-    return render(request, "main/business_page.html", {"item": item})
+    item = get_object_or_404(
+        Listing.objects.select_related("location__state"), slug=slug
+    )
+    request.tracked_listing_id = item.pk
+
+    # Precomputed by `manage.py build_related_listings`
+    similar = (
+        RelatedListing.objects
+        .filter(listing=item)
+        .select_related("related")
+        .order_by("rank")
+    )
+
+    return render(request, "main/business_page.html", {
+        "item": item,
+        "similar": similar,
+    })
+
+
+# ============================================================
+# CLICK TRACKING (sendBeacon from Call / WhatsApp / Website buttons)
+# ============================================================
+@csrf_exempt
+@require_POST
+def track_event(request, listing_id, event):
+    if event not in tracking.EVENT_FIELDS or event == "view":
+        return HttpResponseBadRequest("Unknown event")
+    if not tracking.valid_listing_id(listing_id):
+        raise Http404("No such listing")
+
+    tracking.record(listing_id, event)
+    return HttpResponse(status=204)
+
+
+# ============================================================
+# CHANGE FEED (partners mirror the directory incrementally)
+# GET /api/changes/?since=<cursor>&limit=<n>
+# ============================================================
+def change_feed(request):
+    try:
+        since = int(request.GET.get("since", 0))
+        limit = int(request.GET.get("limit", changefeed.MAX_PAGE_SIZE))
+    except ValueError:
+        return HttpResponseBadRequest("since and limit must be integers")
+
+    changes, cursor, has_more = changefeed.read_changes(since, limit)
+    return JsonResponse({
+        "changes": changes,
+        "next": cursor,
+        "has_more": has_more,
+    })
 
 
 # ============================================================
@@ -78,7 +131,7 @@ def category_listings(request, slug):
     if category.template:
         return redirect("category_template", template_slug=category.template.slug)
 
-    listings = Listing.objects.filter(category=category).order_by("-id")
+    listings = Listing.objects.in_category(category)
 
     return render(request, "main/category_listings.html", {
         "category": category,
@@ -86,6 +139,42 @@ def category_listings(request, slug):
     })
 
 
+# ============================================================
+# CITY PAGES (browse by normalized City)
+# ============================================================
+def city_listings(request, slug):
+    city = get_object_or_404(City.objects.select_related("state"), slug=slug)
+
+    # Maintained counts (main.signals), not a COUNT over the city's listings
+    categories = (
+        city.category_counts
+        .filter(listing_count__gt=0)
+        .select_related("category")
+        .order_by("category__name")
+    )
+
+    return render(request, "main/city_listings.html", {
+        "city": city,
+        "categories": categories,
+        "listing_count": city.listing_count,
+        "listings": Listing.objects.in_city(city),
+    })
+
+
+def city_category_listings(request, slug, category_slug):
+    city = get_object_or_404(City.objects.select_related("state"), slug=slug)
+    category = get_object_or_404(Category, slug=category_slug)
+
+    counts = city.category_counts.filter(category=category).first()
+
+    return render(request, "main/city_listings.html", {
+        "city": city,
+        "category": category,
+        "listing_count": counts.listing_count if counts else 0,
+        "listings": Listing.objects.in_city(city, category),
+    })
+
+
 # ============================================================
 # CATEGORY TEMPLATE PAGE
 # ============================================================
@@ -132,6 +221,15 @@ def search(request):
         if q:
             results = results.filter(title__icontains=q)
 
+        category = form.cleaned_data.get("category")
+        if category:
+            results = results.filter(category=category)
+
+        results = results.in_location(
+            city=form.cleaned_data.get("city"),
+            state=form.cleaned_data.get("state"),
+        )
+
     return render(request, "main/search.html", {
         "form": form,
         "results": results,
@@ -181,7 +279,7 @@ def dashboard_home(request):
 @login_required
 def dashboard_listings(request):
     return render(request, "main/dashboard_listings.html", {
-        "listings": Listing.objects.all().order_by("-id")
+        "listings": Listing.objects.newest()
     })
 
 
@@ -0,0 +1,83 @@
+import logging
+import time
+from pathlib import Path
+
+from django.db import connections
+from django.http import HttpRequest
+from django.template.loader import get_template
+from django.urls import get_resolver, reverse
+
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = Path(__file__).resolve().parent / "templates" / "main"
+
+
+# ==========================================================
+# WORKER WARM-UP
+# Runs once per worker at boot (see dialproject/wsgi.py) so the
+# first real request to home / business_page does not pay for
+# template compilation, URL resolver population or a cold DB.
+# ==========================================================
+def compile_templates():
+    # The cached loader keeps every compiled Template for the worker's lifetime
+    for path in sorted(TEMPLATE_DIR.glob("*.html")):
+        get_template(f"main/{path.name}")
+
+
+def populate_url_resolver():
+    resolver = get_resolver()
+    resolver.reverse_dict  # builds the lookup tables on first access
+    reverse("home")
+
+
+def prime_hot_views():
+    from . import views
+    from .models import Listing
+
+    # Render the real views once: opens the DB connection, warms the
+    # database's page cache and runs every template tag/filter they use
+    views.home(_get_request(reverse("home")))
+
+    listing = Listing.objects.order_by("-id").first()
+    if listing is not None:
+        views.business_page(
+            _get_request(listing.get_absolute_url()), slug=listing.slug
+        )
+
+
+def _get_request(path):
+    request = HttpRequest()
+    request.method = "GET"
+    request.path = request.path_info = path
+    request.META["SERVER_NAME"] = "localhost"
+    request.META["SERVER_PORT"] = "80"
+    return request
+
+
+STEPS = (
+    ("templates", compile_templates),
+    ("url_resolver", populate_url_resolver),
+    ("hot_views", prime_hot_views),
+)
+
+
+def warm_up():
+    """
+    Run every warm-up step and return {step: seconds}.
+
+    A failing step is logged and skipped; warm-up must never stop a
+    worker from booting.
+    """
+    timings = {}
+    for name, step in STEPS:
+        start = time.perf_counter()
+        try:
+            step()
+        except Exception:
+            logger.exception("Warm-up step %s failed", name)
+        timings[name] = time.perf_counter() - start
+
+    # Don't hand an open connection to forked workers (gunicorn --preload)
+    connections.close_all()
+    return timings